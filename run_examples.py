@@ -21,7 +21,8 @@ def get_examples():
         return examples
     
     for file in os.listdir(examples_dir):
-        if file.endswith(".py") and not file.startswith("__"):
+        # Skip package files and private helpers such as _runner.py
+        if file.endswith(".py") and not file.startswith("_"):
             example_name = file[:-3]  # Remove .py extension
             examples.append(example_name)
     
@@ -11,7 +11,7 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        "openai",
+        "openai>=1.17",
         "Pillow",
     ],
     python_requires=">=3.8",
@@ -20,8 +20,15 @@ from .base_planner import ActionPlanner
 from .openai_planner import OpenAIPlanner, OpenAIPlannerOptions
 from .android_controller import (
     get_device_size,
+    get_device_size_cached,
     take_screenshot,
     get_screenshot_base64,
+    get_screenshot_bytes,
+    encode_screenshot,
+    start_minicap,
+    MinicapClient,
+    get_ui_hierarchy,
+    structure_hash,
     tap,
     swipe,
     swipe_up,
@@ -29,13 +36,23 @@ from .android_controller import (
     type_text,
     press_back,
     press_home,
+    press_key,
     launch_app,
+    wait_for_app,
+    wait_for_activity,
     get_current_app,
+    launch_chrome,
     is_keyboard_visible,
+    is_keyboard_visible_async,
+    capture_screenshot_async,
     wait_for_keyboard,
-    dismiss_keyboard
+    dismiss_keyboard,
+    ensure_keyboard_hidden,
+    check_and_dismiss_keyboard,
+    cleanup_and_dismiss
 )
 from .state_tracker import AndroidStateTracker
+from .adb_session import AdbSession, AdbClient
 
 __all__ = [
     # Action related classes
@@ -59,10 +76,21 @@ __all__ = [
     'OpenAIPlanner',
     'OpenAIPlannerOptions',
     
+    # Device connection
+    'AdbSession',
+    'AdbClient',
+    
     # Controller related functions
     'get_device_size',
+    'get_device_size_cached',
     'take_screenshot',
     'get_screenshot_base64',
+    'get_screenshot_bytes',
+    'encode_screenshot',
+    'start_minicap',
+    'MinicapClient',
+    'get_ui_hierarchy',
+    'structure_hash',
     'tap',
     'swipe',
     'swipe_up',
@@ -70,9 +98,18 @@ __all__ = [
     'type_text',
     'press_back',
     'press_home',
+    'press_key',
     'launch_app',
+    'wait_for_app',
+    'wait_for_activity',
     'get_current_app',
+    'launch_chrome',
     'is_keyboard_visible',
+    'is_keyboard_visible_async',
+    'capture_screenshot_async',
     'wait_for_keyboard',
-    'dismiss_keyboard'
+    'dismiss_keyboard',
+    'ensure_keyboard_hidden',
+    'check_and_dismiss_keyboard',
+    'cleanup_and_dismiss'
 ] 
@@ -0,0 +1,253 @@
+"""Persistent ADB shell session and adb server client.
+
+Every `adb shell <cmd>` invocation pays for a new adb process and a new
+shell on the device. This module keeps one `adb shell` open and pipes
+commands through it, using a sentinel echo to find the end of each
+command's output. AdbClient instead talks to the adb server's socket
+directly, skipping the adb CLI altogether.
+"""
+
+import os
+import queue
+import socket
+import subprocess
+import threading
+import time
+from typing import List, Optional, Tuple
+
+_SENTINEL = "__END__"
+
+
+class AdbSession:
+    """A long-lived `adb shell` process that runs commands one at a time.
+
+    Attributes:
+        adb_path: Path to ADB executable
+        timeout: Seconds to wait for a command to finish before the shell is reset
+        last_returncode: Exit status of the most recent command
+    """
+
+    def __init__(self, adb_path: str, timeout: float = 30.0) -> None:
+        """Initialize the session. The shell is started on first use.
+
+        Args:
+            adb_path: Path to ADB executable
+            timeout: Seconds to wait for a command to finish before the shell is reset
+        """
+        self.adb_path = adb_path
+        self.timeout = timeout
+        self.last_returncode: Optional[int] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        """Start the shell process if it isn't running."""
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [self.adb_path, "shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1
+            )
+            # Lines are read on a separate thread so run() can stop waiting at
+            # its deadline; each process gets a fresh queue so output from a
+            # killed shell can't leak into the next command
+            self._lines = queue.Queue()
+            threading.Thread(
+                target=self._pump, args=(self._proc.stdout, self._lines), daemon=True
+            ).start()
+        return self._proc
+
+    @staticmethod
+    def _pump(stdout, lines: "queue.Queue[Optional[str]]") -> None:
+        """Forward the shell's output lines to the queue, then None at EOF."""
+        try:
+            for line in stdout:
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put(None)
+
+    def _reset(self) -> None:
+        """Kill the shell process so the next command starts a fresh one."""
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc = None
+
+    def run(self, cmd: str, timeout: Optional[float] = None) -> str:
+        """Run a shell command on the device and return its output.
+
+        Args:
+            cmd: Command line to run in the device shell
+            timeout: Seconds to wait for this command; the session timeout if None
+
+        Returns:
+            The command's stdout
+
+        Raises:
+            RuntimeError: If the shell exits or the command doesn't finish
+                within the timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        with self._lock:
+            proc = self._ensure_started()
+            try:
+                proc.stdin.write(f"{cmd}; echo {_SENTINEL}$?\n")
+                proc.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self._proc = None
+                raise RuntimeError(f"ADB shell session closed: {e}") from e
+
+            deadline = time.monotonic() + timeout
+            lines = []
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    self._reset()
+                    raise RuntimeError(f"ADB shell command timed out after {timeout}s: {cmd}")
+                if line is None:
+                    self._proc = None
+                    raise RuntimeError("ADB shell session closed unexpectedly")
+                pos = line.find(_SENTINEL)
+                if pos < 0:
+                    lines.append(line)
+                    continue
+                # Output without a trailing newline ends up on the sentinel line
+                if pos:
+                    lines.append(line[:pos])
+                try:
+                    self.last_returncode = int(line[pos + len(_SENTINEL):].strip())
+                except ValueError:
+                    self.last_returncode = None
+                return "".join(lines)
+
+    def close(self) -> None:
+        """Terminate the shell process."""
+        with self._lock:
+            if self._proc is None:
+                return
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=2)
+            except Exception:
+                self._proc.kill()
+            self._proc = None
+
+    def __enter__(self) -> "AdbSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AdbClient:
+    """Minimal client for the local adb server's socket protocol.
+
+    Talks to the adb server (localhost:5037 by default) directly instead of
+    spawning the adb CLI for each command. Each request uses a fresh
+    connection to the already-running server, which is far cheaper than a
+    new adb process. Has the same `run`/`last_returncode` interface as
+    AdbSession, so it can be passed wherever a session is accepted.
+
+    Attributes:
+        host: Host the adb server listens on
+        port: Port the adb server listens on
+        serial: Device serial to target; any single device if None
+        timeout: Socket timeout in seconds
+        last_returncode: Exit status of the most recent shell command
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5037, serial: Optional[str] = None,
+                 timeout: float = 5.0) -> None:
+        """Initialize the client. No connection is made until a request is sent.
+
+        Args:
+            host: Host the adb server listens on
+            port: Port the adb server listens on
+            serial: Device serial to target (defaults to $ANDROID_SERIAL)
+            timeout: Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.serial = serial if serial is not None else os.environ.get("ANDROID_SERIAL")
+        self.timeout = timeout
+        self.last_returncode: Optional[int] = None
+
+    def _request(self, sock: socket.socket, payload: str) -> None:
+        """Send one length-prefixed request and check the server's status reply."""
+        data = payload.encode("utf-8")
+        sock.sendall(b"%04x" % len(data) + data)
+        status = self._read_exact(sock, 4)
+        if status != b"OKAY":
+            message = ""
+            if status == b"FAIL":
+                message = self._read_exact(sock, int(self._read_exact(sock, 4), 16)).decode("utf-8", "replace")
+            raise RuntimeError(f"adb server rejected '{payload}': {message or status!r}")
+
+    @staticmethod
+    def _read_exact(sock: socket.socket, size: int) -> bytes:
+        """Read exactly size bytes from the socket."""
+        buf = b""
+        while len(buf) < size:
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise RuntimeError("adb server closed the connection")
+            buf += chunk
+        return buf
+
+    def _connect(self) -> socket.socket:
+        """Open a connection to the adb server."""
+        return socket.create_connection((self.host, self.port), timeout=self.timeout)
+
+    def devices(self) -> List[Tuple[str, str]]:
+        """List devices known to the adb server.
+
+        Returns:
+            List of (serial, state) tuples, e.g. ("emulator-5554", "device")
+        """
+        with self._connect() as sock:
+            self._request(sock, "host:devices")
+            length = int(self._read_exact(sock, 4), 16)
+            output = self._read_exact(sock, length).decode("utf-8", "replace")
+        return [tuple(line.split("\t", 1)) for line in output.splitlines() if "\t" in line]
+
+    def run(self, cmd: str, timeout: Optional[float] = None) -> str:
+        """Run a shell command on the device and return its output.
+
+        Args:
+            cmd: Command line to run in the device shell
+            timeout: Socket timeout for this command; the client timeout if None
+
+        Returns:
+            The command's stdout
+
+        Raises:
+            RuntimeError: If the adb server rejects the request
+        """
+        transport = f"host:transport:{self.serial}" if self.serial else "host:transport-any"
+        with self._connect() as sock:
+            if timeout is not None:
+                sock.settimeout(timeout)
+            self._request(sock, transport)
+            self._request(sock, f"shell:{cmd}; echo {_SENTINEL}$?")
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        output = b"".join(chunks).decode("utf-8", "replace").replace("\r\n", "\n")
+        pos = output.rfind(_SENTINEL)
+        if pos < 0:
+            self.last_returncode = None
+            return output
+        try:
+            self.last_returncode = int(output[pos + len(_SENTINEL):].strip())
+        except ValueError:
+            self.last_returncode = None
+        return output[:pos]
@@ -4,7 +4,9 @@ This module provides the core Android automation functionality including state
 management, action planning, and action execution.
 """
 
+import asyncio
 import base64
+import hashlib
 import json
 import os
 import time
@@ -13,11 +15,17 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Union
 import random
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from .android_controller import (
     get_device_size,
     take_screenshot,
-    get_screenshot_base64,
+    get_screenshot_bytes,
+    encode_screenshot,
+    MinicapClient,
+    get_ui_hierarchy,
+    structure_hash,
     tap,
     swipe,
     swipe_up,
@@ -25,14 +33,18 @@ from .android_controller import (
     type_text,
     press_back,
     press_home,
+    press_key,
     launch_app,
     get_current_app,
     wait_for_keyboard,
     is_keyboard_visible,
+    is_keyboard_visible_async,
+    capture_screenshot_async,
     dismiss_keyboard,
     smart_type_text,
     type_text_with_uiautomator2
 )
+from .adb_session import AdbSession
 from .android_action import AndroidAction, AndroidActionType, Coordinate, SwipeCoordinates
 from .state_tracker import AndroidStateTracker
 from .android_state import AndroidState
@@ -60,12 +72,40 @@ class AndroidAgentOptions:
         pause_after_each_action: Whether to pause after each action
         max_steps: Maximum number of steps before stopping
         screenshot_dir: Directory to save screenshots
+        adb_session: Persistent ADB shell session for key presses and keyboard checks
+        parallel_probes: Capture the screenshot and probe the keyboard concurrently
+        use_minicap: Read screenshots from a running minicap stream (see start_minicap)
+        minicap_port: Local TCP port the minicap socket is forwarded to
+        track_ui_structure: Dump the view hierarchy each step and record its structure hash
+        fast_input: Send taps, swipes and text through adb_session instead of a new adb process each
+        screenshot_max_dim: Downscale screenshots so neither side exceeds this many pixels
+        screenshot_format: Format screenshots are sent to the planner in ("png" or "jpeg")
+        screenshot_quality: JPEG quality used when screenshot_format is "jpeg"
+        screenshot_dir_fd: Open descriptor of screenshot_dir; step screenshots are
+            written relative to it instead of resolving the directory path each time
+        enable_stuck_detector: Press BACK without planning when both the UI structure
+            hash and the screenshot are unchanged for three consecutive steps
+            (implies track_ui_structure)
+        enable_shortcuts: Let the planner skip the model when the next action is
+            already determined (e.g. typing the goal's quoted query into a focused field)
     """
     additional_context: Optional[Union[str, Dict[str, Any]]] = None
     additional_instructions: Optional[List[str]] = None
     pause_after_each_action: bool = False
     max_steps: int = 50
     screenshot_dir: str = "screenshots"
+    adb_session: Optional[AdbSession] = None
+    parallel_probes: bool = False
+    use_minicap: bool = False
+    minicap_port: int = 1313
+    track_ui_structure: bool = False
+    fast_input: bool = False
+    screenshot_max_dim: Optional[int] = None
+    screenshot_format: str = "png"
+    screenshot_quality: int = 80
+    screenshot_dir_fd: Optional[int] = None
+    enable_stuck_detector: bool = False
+    enable_shortcuts: bool = False
 
 
 class AndroidAgent:
@@ -116,6 +156,32 @@ class AndroidAgent:
         self.repeated_states: int = 0
         self.max_repeated_states: int = 3
         self.device = None
+        self._minicap: Optional[MinicapClient] = None
+        self._last_hashes: deque = deque(maxlen=3)
+        # State captured in the background after the last action, see step(prefetch=True)
+        self._prefetched: Optional[Future] = None
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+    
+    def reset(self, goal: str) -> None:
+        """Prepare the agent for a new goal.
+        
+        Clears the history, status and loop-detection state of the previous
+        run while keeping the planner, options and device connections.
+        
+        Args:
+            goal: Goal to achieve next
+        """
+        self.goal = goal
+        self.state_tracker = AndroidStateTracker()
+        self._status = AndroidGoalState.INITIAL
+        self.history = []
+        self.action_counts = {action_type: 0 for action_type in AndroidActionType}
+        self.last_state_hash = None
+        self.repeated_states = 0
+        self.home_screen_attempts = 0
+        self.last_actions = []
+        self._last_hashes.clear()
+        self._prefetched = None
     
     def _take_action(self, action: AndroidAction) -> bool:
         """Execute an action on the device.
@@ -147,6 +213,9 @@ class AndroidAgent:
                 self.action_counts[action_type] = 0
             self.action_counts[action_type] += 1
             
+            # Input commands go through the persistent shell when fast_input is on
+            input_session = self.options.adb_session if self.options.fast_input else None
+            
             # Handle different action types
             if action_type == AndroidActionType.TAP:
                 if not action.coordinate:
@@ -160,7 +229,7 @@ class AndroidAgent:
                 x, y = action.coordinate.x, action.coordinate.y
                 
                 # Let tap function handle the coordinate scaling
-                tap_result = tap(self.adb_path, x, y, device_w, device_h)
+                tap_result = tap(self.adb_path, x, y, device_w, device_h, session=input_session)
                 
                 if tap_result:
                     # Record input-box tap for subsequent TYPE actions
@@ -172,7 +241,7 @@ class AndroidAgent:
                 # If tap failed, try alternative tap location slightly offset
                 print("⚠️ First tap failed, trying offset tap...")
                 offset = 5  # 5 pixel offset
-                tap_result = tap(self.adb_path, x + offset, y + offset, device_w, device_h)
+                tap_result = tap(self.adb_path, x + offset, y + offset, device_w, device_h, session=input_session)
                 
                 if tap_result:
                     if self.state_tracker._is_input_box(action.coordinate):
@@ -186,32 +255,34 @@ class AndroidAgent:
                     print("❌ Error: No text specified for type action")
                     return False
                 # Inject text directly via ADB without UIAutomator2
-                type_text(self.adb_path, action.text)
+                type_text(self.adb_path, action.text, session=input_session)
                 print(f"⌨️ Typed text via ADB shell: '{action.text}'")
                 return True
             elif action_type == AndroidActionType.SWIPE_UP:
-                swipe_up(self.adb_path, distance=0.5)
+                swipe_up(self.adb_path, distance=0.5, session=input_session)
             elif action_type == AndroidActionType.SWIPE_DOWN:
-                swipe_down(self.adb_path, distance=0.5)
+                swipe_down(self.adb_path, distance=0.5, session=input_session)
             elif action_type == AndroidActionType.SWIPE:
                 if not action.start_coordinate or not action.end_coordinate:
                     print("❌ Error: Start and end coordinates required for swipe action")
                     return False
                 start_x, start_y = action.start_coordinate.x, action.start_coordinate.y
                 end_x, end_y = action.end_coordinate.x, action.end_coordinate.y
-                swipe(self.adb_path, start_x, start_y, end_x, end_y)
+                swipe(self.adb_path, start_x, start_y, end_x, end_y, session=input_session)
             elif action_type == AndroidActionType.PRESS:
                 if action.key is None:
                     print("❌ Error: No key specified for press action")
                     return False
                 key = action.key
+                session = self.options.adb_session
                 if key == 4:  # Back button
-                    press_back(self.adb_path)
+                    press_back(self.adb_path, session=session)
                 elif key == 3:  # Home button
-                    press_home(self.adb_path)
+                    press_home(self.adb_path, session=session)
+                elif session is not None:
+                    press_key(self.adb_path, key, session=session)
                 else:
-                    command = f"{self.adb_path} shell input keyevent {key}"
-                    subprocess.run(command, shell=True, check=True)
+                    subprocess.run([self.adb_path, "shell", "input", "keyevent", str(key)], check=True)
             elif action_type == AndroidActionType.WAIT:
                 # Use at least 5 seconds for wait actions
                 duration = action.duration if action.duration is not None else 5
@@ -255,9 +326,10 @@ class AndroidAgent:
                         
                         # If all package attempts fail, try using monkey
                         print("🌐 Trying monkey command for Chrome launch...")
-                        monkey_cmd = f"{self.adb_path} shell monkey -p {action.package} -c android.intent.category.LAUNCHER 1"
+                        monkey_cmd = [self.adb_path, "shell", "monkey", "-p", action.package,
+                                      "-c", "android.intent.category.LAUNCHER", "1"]
                         try:
-                            result = subprocess.run(monkey_cmd, shell=True, check=False, capture_output=True, text=True)
+                            result = subprocess.run(monkey_cmd, check=False, capture_output=True, text=True)
                             if "Events injected: 1" in result.stdout:
                                 print("✅ Chrome launched via monkey command")
                                 time.sleep(2)  # Wait for Chrome to fully load
@@ -322,7 +394,26 @@ class AndroidAgent:
             
             # Take screenshot directly to memory using base64
             print(f"📸 Taking screenshot...")
-            screenshot_base64 = get_screenshot_base64(self.adb_path, screenshot_path)
+            keyboard_visible = None
+            screenshot_mime = "image/png"
+            raw_bytes = self._minicap_frame() if self.options.use_minicap else None
+            if raw_bytes:
+                screenshot_mime = "image/jpeg"
+            elif self.options.parallel_probes:
+                raw_bytes, keyboard_visible = asyncio.run(self._probe_device())
+            else:
+                raw_bytes = get_screenshot_bytes(self.adb_path, screenshot_path)
+            if screenshot_mime == "image/png" and (
+                self.options.screenshot_max_dim or self.options.screenshot_format != "png"
+            ):
+                raw_bytes, screenshot_mime = encode_screenshot(
+                    raw_bytes,
+                    self.options.screenshot_max_dim,
+                    self.options.screenshot_format,
+                    self.options.screenshot_quality
+                )
+            screenshot_hash = hashlib.blake2b(raw_bytes, digest_size=16).digest()
+            screenshot_base64 = base64.b64encode(raw_bytes).decode('utf-8')
             print(f"✅ Screenshot captured: {len(screenshot_base64)//1024}KB in base64")
             
             # Clean up the saved screenshot immediately
@@ -358,13 +449,24 @@ class AndroidAgent:
                 
             print(f"📱 Current app: {current_app}")
             
+            ui_hash = b""
+            if self.options.track_ui_structure or self.options.enable_stuck_detector:
+                root = get_ui_hierarchy(self.adb_path, session=self.options.adb_session)
+                if root is not None:
+                    ui_hash = structure_hash(root)
+            
             # Create state object
             return AndroidState(
                 screenshot=screenshot_base64,
                 height=height,
                 width=width,
                 current_app=current_app,
-                timestamp=timestamp
+                timestamp=timestamp,
+                raw_bytes=raw_bytes,
+                screenshot_hash=screenshot_hash,
+                keyboard_visible=keyboard_visible,
+                screenshot_mime=screenshot_mime,
+                structure_hash=ui_hash
             )
             
         except Exception as e:
@@ -387,6 +489,30 @@ class AndroidAgent:
                 print(f"❌ Fatal error capturing device state: {inner_e}")
                 raise
     
+    def _minicap_frame(self) -> Optional[bytes]:
+        """Return the latest minicap frame, or None to fall back to screencap."""
+        try:
+            if self._minicap is None:
+                self._minicap = MinicapClient(port=self.options.minicap_port)
+            return self._minicap.get_frame()
+        except Exception as e:
+            print(f"⚠️ minicap unavailable, falling back to screencap: {e}")
+            if self._minicap is not None:
+                self._minicap.close()
+                self._minicap = None
+            return None
+    
+    async def _probe_device(self) -> Tuple[bytes, bool]:
+        """Capture a screenshot and check the keyboard at the same time.
+        
+        Returns:
+            Tuple of (raw PNG bytes, whether the keyboard is visible)
+        """
+        return tuple(await asyncio.gather(
+            capture_screenshot_async(self.adb_path),
+            is_keyboard_visible_async(self.adb_path)
+        ))
+    
     def _check_for_chrome_ui(self, screenshot_base64: str) -> bool:
         """Check if the screenshot contains Chrome UI elements.
         
@@ -517,14 +643,31 @@ class AndroidAgent:
             
         return False
     
-    def step(self) -> None:
+    def _take_prefetched_state(self) -> Optional[AndroidState]:
+        """Return the state captured in the background after the last action, if any."""
+        pending, self._prefetched = self._prefetched, None
+        if pending is None:
+            return None
+        try:
+            return pending.result()
+        except Exception as e:
+            print(f"⚠️ Background state capture failed: {e}")
+            return None
+    
+    def step(self, prefetch: bool = False) -> None:
         """Execute a single automation step.
         
         Gets current state, determines next action, executes it,
         and updates history.
+        
+        Args:
+            prefetch: After each executed action, start capturing the next
+                step's state in the background while the planner's response
+                is still streaming. If the plan holds another action, the
+                capture is finished and discarded before that action runs.
         """
         # Get current state
-        current_state = self.get_state()
+        current_state = self._take_prefetched_state() or self.get_state()
         
         # Check for repeated states
         repeated_state = self.detect_repeated_state(current_state)
@@ -540,7 +683,9 @@ class AndroidAgent:
             
         # Check keyboard state to update the state tracker
         try:
-            keyboard_visible = is_keyboard_visible(self.adb_path)
+            keyboard_visible = current_state.keyboard_visible
+            if keyboard_visible is None:
+                keyboard_visible = is_keyboard_visible(self.adb_path, session=self.options.adb_session)
             self.state_tracker.set_keyboard_visible(keyboard_visible)
             print(f"⌨️ Keyboard visible: {keyboard_visible}")
         except Exception as e:
@@ -564,13 +709,15 @@ class AndroidAgent:
                 print("🌐 Chrome detected in repeated tap loop - trying direct command")
                 
                 # First try to go home to reset the state
-                press_home(self.adb_path)
+                press_home(self.adb_path, session=self.options.adb_session)
                 time.sleep(1)
                 
                 # Try direct Chrome launch with am start (most reliable method)
                 try:
-                    chrome_cmd = f"{self.adb_path} shell am start -a android.intent.action.VIEW -d \"about:blank\" -n com.android.chrome/com.google.android.apps.chrome.Main"
-                    subprocess.run(chrome_cmd, shell=True)
+                    subprocess.run([
+                        self.adb_path, "shell", "am", "start", "-a", "android.intent.action.VIEW",
+                        "-d", "about:blank", "-n", "com.android.chrome/com.google.android.apps.chrome.Main"
+                    ])
                     time.sleep(2)
                     
                     # Check if Chrome launched
@@ -590,8 +737,10 @@ class AndroidAgent:
                 # Try with monkey command as fallback
                 try:
                     print("🌐 Trying monkey command to launch Chrome")
-                    monkey_cmd = f"{self.adb_path} shell monkey -p com.android.chrome -c android.intent.category.LAUNCHER 1"
-                    subprocess.run(monkey_cmd, shell=True)
+                    subprocess.run([
+                        self.adb_path, "shell", "monkey", "-p", "com.android.chrome",
+                        "-c", "android.intent.category.LAUNCHER", "1"
+                    ])
                     time.sleep(2)
                     
                     # Record as a successful recovery
@@ -607,7 +756,7 @@ class AndroidAgent:
             
             # First check if keyboard is visible
             try:
-                if is_keyboard_visible(self.adb_path):
+                if is_keyboard_visible(self.adb_path, session=self.options.adb_session):
                     print("⌨️ Keyboard is visible but stuck in tap loop - attempting to type")
                     # Try typing a search term as a recovery action
                     recovery_action = AndroidAction(
@@ -657,27 +806,110 @@ class AndroidAgent:
         
         # Save screenshot to file if requested
         if self.options.screenshot_dir:
-            # Create filename with timestamp and step number
-            timestamp = int(time.time())
-            filename = f"{self.options.screenshot_dir}/step_{len(self.history) + 1:02d}_{timestamp}.png"
-            try:
-                take_screenshot(self.adb_path, filename)
-                print(f"📸 Saved screenshot to {filename}")
-            except Exception as e:
-                print(f"⚠️ Failed to save screenshot: {e}")
+            self._save_step_screenshot(current_state)
+        
+        # Same UI structure and pixels three steps running - back out without asking
+        # the planner. The structure hash alone ignores text and checked state, so
+        # typing or ticking items on one screen would otherwise look stuck
+        if self.options.enable_stuck_detector and current_state.structure_hash:
+            self._last_hashes.append((current_state.structure_hash, current_state.screenshot_hash))
+            if len(self._last_hashes) == self._last_hashes.maxlen and len(set(self._last_hashes)) == 1:
+                print("🔁 Screen unchanged for 3 steps - pressing BACK without planning")
+                self._last_hashes.clear()
+                recovery_action = AndroidAction(
+                    action=AndroidActionType.PRESS,
+                    key=4  # Back key
+                )
+                self._handle_action(current_state, recovery_action)
+                return
                 
-        next_action = self.planner.plan_action(
-            self.goal,
-            self.options.additional_context,
-            self.options.additional_instructions,
-            current_state,
-            self.history
-        )
+        # Skip the planner when the next action is already determined
+        shortcut = None
+        if self.options.enable_shortcuts:
+            shortcut = self.planner.try_shortcut(self.goal, self.state_tracker, self.history)
+        if shortcut:
+            print(f"⚡ Shortcut: typing \"{shortcut.text}\" without planning")
+            actions = iter([shortcut])
+        else:
+            # Actions arrive as soon as the planner emits them, so the first one
+            # runs while the rest of the response is still streaming
+            actions = self.planner.plan_stream(
+                self.goal,
+                self.options.additional_context,
+                self.options.additional_instructions,
+                current_state,
+                self.history
+            )
+        
+        handled = False
+        try:
+            for next_action in actions:
+                handled = True
+                # A capture started after the previous action is stale now
+                self._take_prefetched_state()
+                if not self._handle_action(current_state, next_action):
+                    break
+                # Nothing consumes a capture once the run has finished
+                if prefetch and self._status in (AndroidGoalState.INITIAL, AndroidGoalState.RUNNING):
+                    if self._prefetch_pool is None:
+                        self._prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+                    self._prefetched = self._prefetch_pool.submit(self.get_state)
+        finally:
+            if hasattr(actions, "close"):
+                actions.close()
+        
+        if not handled:
+            print("❌ Failed to determine next action")
+            self.update_status(AndroidGoalState.FAILED)
+    
+    def _save_step_screenshot(self, current_state: AndroidState) -> None:
+        """Write the screenshot already captured for this step to the screenshot directory.
         
+        Args:
+            current_state: State holding the captured screenshot bytes
+        """
+        # Create filename with timestamp and step number
+        timestamp = int(time.time())
+        ext = "jpg" if current_state.screenshot_mime == "image/jpeg" else "png"
+        name = f"step_{len(self.history) + 1:02d}_{timestamp}.{ext}"
+        dir_fd = self.options.screenshot_dir_fd
+        
+        try:
+            if not current_state.raw_bytes:
+                # No bytes captured for this state - take a fresh screenshot instead
+                filename = os.path.join(self.options.screenshot_dir, name)
+                take_screenshot(self.adb_path, filename)
+            elif dir_fd is not None and os.open in os.supports_dir_fd:
+                filename = os.path.join(self.options.screenshot_dir, name)
+                fd = os.open(name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+                try:
+                    view = memoryview(current_state.raw_bytes)
+                    while view:
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+            else:
+                filename = os.path.join(self.options.screenshot_dir, name)
+                with open(filename, "wb") as f:
+                    f.write(current_state.raw_bytes)
+            print(f"📸 Saved screenshot to {filename}")
+        except Exception as e:
+            print(f"⚠️ Failed to save screenshot: {e}")
+    
+    def _handle_action(self, current_state: AndroidState, next_action: Optional[AndroidAction]) -> bool:
+        """Execute one planned action and record it in the history.
+        
+        Args:
+            current_state: State the action was planned for
+            next_action: Action to execute
+            
+        Returns:
+            bool: Whether further actions from the same plan may be executed
+        """
         if not next_action:
             print("❌ Failed to determine next action")
             self.update_status(AndroidGoalState.FAILED)
-            return
+            return False
             
         # Record that we're starting a specific action
         action_desc = f"{next_action.action}"
@@ -692,11 +924,11 @@ class AndroidAgent:
         if next_action.action == AndroidActionType.SUCCESS:
             print("🎯 Goal reached!")
             self.update_status(AndroidGoalState.SUCCESS)
-            return
+            return False
         elif next_action.action == AndroidActionType.FAILURE:
             print("❌ Failed to achieve goal")
             self.update_status(AndroidGoalState.FAILED)
-            return
+            return False
         
         # Special case for opening Chrome - only when on the launcher
         if next_action.action == AndroidActionType.TAP:
@@ -712,11 +944,14 @@ class AndroidAgent:
                 
                 # First, try a specialized Chrome launch command (more reliable than LAUNCH_APP)
                 # This uses am start with the explicit Chrome launcher activity
-                chrome_launch_cmd = f"{self.adb_path} shell am start -a android.intent.action.VIEW -d \"about:blank\" -n com.android.chrome/com.google.android.apps.chrome.Main"
+                chrome_launch_cmd = [
+                    self.adb_path, "shell", "am", "start", "-a", "android.intent.action.VIEW",
+                    "-d", "about:blank", "-n", "com.android.chrome/com.google.android.apps.chrome.Main"
+                ]
                 
                 try:
                     print("🌐 Executing Chrome-specific launch command...")
-                    result = subprocess.run(chrome_launch_cmd, shell=True, capture_output=True, text=True)
+                    result = subprocess.run(chrome_launch_cmd, capture_output=True, text=True)
                     
                     if result.returncode == 0 and "Error" not in result.stdout:
                         print("✅ Chrome-specific launch command successful")
@@ -727,7 +962,7 @@ class AndroidAgent:
                             state=current_state,
                             action=next_action
                         ))
-                        return
+                        return False
                     else:
                         print(f"⚠️ Chrome-specific launch failed: {result.stderr}")
                 except Exception as e:
@@ -743,8 +978,9 @@ class AndroidAgent:
                 for package in chrome_packages:
                     try:
                         print(f"🌐 Trying to launch {package}...")
-                        alt_cmd = f"{self.adb_path} shell monkey -p {package} -c android.intent.category.LAUNCHER 1"
-                        result = subprocess.run(alt_cmd, shell=True, capture_output=True, text=True)
+                        alt_cmd = [self.adb_path, "shell", "monkey", "-p", package,
+                                   "-c", "android.intent.category.LAUNCHER", "1"]
+                        result = subprocess.run(alt_cmd, capture_output=True, text=True)
                         
                         if "Events injected: 1" in result.stdout:
                             print(f"✅ Successfully launched Chrome via {package}")
@@ -755,7 +991,7 @@ class AndroidAgent:
                                 state=current_state,
                                 action=next_action
                             ))
-                            return
+                            return False
                     except Exception as e:
                         print(f"⚠️ Error with alternative Chrome launch: {e}")
                 
@@ -780,24 +1016,41 @@ class AndroidAgent:
         if len(self.history) >= self.options.max_steps:
             print("⚠️ Maximum number of steps reached")
             self.update_status(AndroidGoalState.FAILED)
+            return False
+        
+        return True
     
-    def start(self) -> None:
+    def start(self, prefetch: bool = False) -> None:
         """Start the Android automation process.
         
         Runs steps until goal is achieved, maximum steps reached,
         or failure occurs.
+        
+        Args:
+            prefetch: Capture each next state while the planner is still
+                streaming (see step)
         """
         print(f"Starting Android Agent with goal: {self.goal}")
         print(f"Maximum steps: {self.options.max_steps}")
         
+        # The planner may have served an earlier run with another goal
+        self.planner.reset()
+        
         step_count = 0
-        while (
-            self._status in (AndroidGoalState.INITIAL, AndroidGoalState.RUNNING) and
-            step_count < self.options.max_steps
-        ):
-            print(f"\nStep {step_count + 1}/{self.options.max_steps}")
-            self.step()
-            step_count += 1
+        try:
+            while (
+                self._status in (AndroidGoalState.INITIAL, AndroidGoalState.RUNNING) and
+                step_count < self.options.max_steps
+            ):
+                print(f"\nStep {step_count + 1}/{self.options.max_steps}")
+                # The last step has no next step to capture a state for
+                self.step(prefetch=prefetch and step_count + 1 < self.options.max_steps)
+                step_count += 1
+        finally:
+            self._prefetched = None
+            if self._prefetch_pool is not None:
+                self._prefetch_pool.shutdown(wait=True)
+                self._prefetch_pool = None
         
         if self._status == AndroidGoalState.RUNNING:
             print(f"Reached maximum number of steps ({self.options.max_steps})")
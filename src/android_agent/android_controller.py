@@ -4,13 +4,53 @@ This module provides functions to interact with an Android device
 through ADB (Android Debug Bridge).
 """
 
+import asyncio
 import base64
+import functools
+import hashlib
+import io
 import os
+import socket
+import struct
 import subprocess
+import threading
 import time
 import importlib.util
-from typing import Tuple, Optional, Union, Dict, Any
+from typing import Tuple, Optional, Union, Dict, Any, List
 import re
+import shlex
+import xml.etree.ElementTree as ET
+
+from .adb_session import AdbSession
+
+
+def _shell(adb_path: str, cmd: str, session: Optional[AdbSession] = None) -> str:
+    """Run a device shell command, through the session if one is given.
+    
+    Args:
+        adb_path: Path to ADB executable
+        cmd: Command line to run in the device shell
+        session: Optional persistent shell session
+        
+    Returns:
+        The command's stdout
+    """
+    if session is not None:
+        return session.run(cmd)
+    return subprocess.run([adb_path, "shell", cmd], capture_output=True, text=True).stdout
+
+
+def _run_adb_quiet(argv: List[str]) -> Tuple[int, bytes]:
+    """Run an adb command whose output is not needed, keeping only stderr for errors.
+    
+    Args:
+        argv: adb command line
+        
+    Returns:
+        Tuple of (exit code, raw stderr)
+    """
+    result = subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return result.returncode, result.stderr
 
 
 def get_device_size(adb_path: str) -> Tuple[int, int]:
@@ -81,91 +121,71 @@ def take_screenshot(adb_path: str, output_path: str = "screenshot.png") -> str:
         raise
 
 
-def get_screenshot_base64(adb_path: str, temp_path: str = "temp_screenshot.png") -> str:
-    """Capture screenshot and return as base64 encoded string.
+def get_screenshot_bytes(adb_path: str, temp_path: str = "temp_screenshot.png") -> bytes:
+    """Capture screenshot and return the raw PNG bytes.
     
     This implementation is inspired by Cerebellum's approach:
-    - Minimizes disk I/O by reading directly from device
-    - Handles cleanup of temporary files
-    - Uses efficient base64 encoding
+    - Streams the PNG straight from `adb exec-out` with no file on either side
+    - Only falls back to a device-side file and `adb pull` if that fails
     
     Args:
         adb_path: Path to ADB executable
-        temp_path: Temporary path to save screenshot
+        temp_path: Temporary local path used by the pull fallback
         
     Returns:
-        Base64 encoded string of screenshot
+        Raw PNG bytes of the screenshot
     """
     try:
-        # First check if device is connected
-        device_check = subprocess.run(
-            f"{adb_path} devices",
-            shell=True,
-            capture_output=True,
-            text=True
-        )
-        
-        if "device" not in device_check.stdout and "emulator" not in device_check.stdout:
-            print(f"⚠️ No device connected. ADB output: {device_check.stdout}")
-            raise RuntimeError("No Android device connected")
-        
-        # Create parent directory if it doesn't exist
-        os.makedirs(os.path.dirname(os.path.abspath(temp_path)), exist_ok=True)
-        
-        print(f"📱 Capturing screenshot to {temp_path}...")
+        print("📱 Capturing screenshot...")
         
-        # Try direct capture method first (faster)
+        # exec-out gives the binary stdout unmodified - one round trip, no CRLF munging
         try:
-            result = subprocess.run(
-                f"{adb_path} exec-out screencap -p > {temp_path}",
-                shell=True,
+            data = subprocess.run(
+                [adb_path, "exec-out", "screencap", "-p"],
                 check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            # Check if file was created and has content
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-                print("⚠️ Direct screenshot capture failed, trying fallback method...")
-                raise FileNotFoundError("Screenshot file not created")
-                
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+                capture_output=True
+            ).stdout
+            if not data.startswith(b"\x89PNG"):
+                raise ValueError(f"exec-out returned {len(data)} bytes of non-PNG data")
+            print(f"✅ Screenshot captured successfully ({len(data)/1024:.1f} KB)")
+            return data
+        except (subprocess.CalledProcessError, ValueError) as e:
             print(f"⚠️ First screenshot method failed: {e}, trying alternative method...")
-            # Fallback to pull method
+        
+        # Fallback to pull method
+        os.makedirs(os.path.dirname(os.path.abspath(temp_path)), exist_ok=True)
+        try:
             subprocess.run(
-                f"{adb_path} shell screencap -p /sdcard/temp_screenshot.png",
-                shell=True,
-                check=True
+                [adb_path, "shell", "screencap", "-p", "/sdcard/temp_screenshot.png"],
+                check=True,
+                capture_output=True
             )
             subprocess.run(
-                f"{adb_path} pull /sdcard/temp_screenshot.png {temp_path}",
-                shell=True,
-                check=True
+                [adb_path, "pull", "/sdcard/temp_screenshot.png", temp_path],
+                check=True,
+                capture_output=True
             )
             subprocess.run(
-                f"{adb_path} shell rm /sdcard/temp_screenshot.png",
-                shell=True
+                [adb_path, "shell", "rm", "/sdcard/temp_screenshot.png"],
+                capture_output=True
             )
-        
-        # Read and encode screenshot
-        if not os.path.exists(temp_path):
-            raise FileNotFoundError(f"Screenshot file not created at {temp_path}")
-            
-        file_size = os.path.getsize(temp_path)
-        if file_size == 0:
-            raise ValueError(f"Screenshot file is empty (0 bytes)")
             
-        print(f"✅ Screenshot captured successfully ({file_size/1024:.1f} KB)")
-        
-        with open(temp_path, "rb") as image_file:
-            encoded = base64.b64encode(image_file.read()).decode('utf-8')
-            # Don't print the actual base64 data, just its size
-            print(f"✅ Screenshot encoded to base64: {len(encoded)/1024:.1f} KB")
-            return encoded
+            with open(temp_path, "rb") as image_file:
+                data = image_file.read()
+            if not data:
+                raise ValueError("Screenshot file is empty (0 bytes)")
+            print(f"✅ Screenshot captured successfully ({len(data)/1024:.1f} KB)")
+            return data
+        finally:
+            # Clean up temporary file
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except Exception as e:
+                    print(f"⚠️ Warning: Failed to clean up temporary screenshot: {e}")
             
     except subprocess.CalledProcessError as e:
         print(f"❌ Error executing ADB command: {e}")
-        print(f"Command output: {e.stdout if hasattr(e, 'stdout') else 'None'}")
         print(f"Command stderr: {e.stderr if hasattr(e, 'stderr') else 'None'}")
         raise RuntimeError(f"ADB command failed: {str(e)}") from e
     except FileNotFoundError as e:
@@ -176,15 +196,299 @@ def get_screenshot_base64(adb_path: str, temp_path: str = "temp_screenshot.png")
         import traceback
         traceback.print_exc()
         raise RuntimeError(f"Screenshot failed: {str(e)}") from e
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                # Don't print a potentially large message
-                print(f"✅ Cleaned up temporary screenshot file")
-            except Exception as e:
-                print(f"⚠️ Warning: Failed to clean up temporary screenshot: {e}")
+
+
+def get_screenshot_base64(adb_path: str, temp_path: str = "temp_screenshot.png") -> str:
+    """Capture screenshot and return as base64 encoded string.
+    
+    Args:
+        adb_path: Path to ADB executable
+        temp_path: Temporary path to save screenshot
+        
+    Returns:
+        Base64 encoded string of screenshot
+    """
+    encoded = base64.b64encode(get_screenshot_bytes(adb_path, temp_path)).decode('utf-8')
+    # Don't print the actual base64 data, just its size
+    print(f"✅ Screenshot encoded to base64: {len(encoded)/1024:.1f} KB")
+    return encoded
+
+
+def encode_screenshot(raw: bytes, max_dim: Optional[int] = None, fmt: str = "png",
+                      quality: int = 80) -> Tuple[bytes, str]:
+    """Downscale and re-encode a screenshot before it is sent to the planner.
+    
+    Args:
+        raw: Screenshot image bytes
+        max_dim: Maximum width/height in pixels, or None to keep the size
+        fmt: Output format, "png" or "jpeg"
+        quality: JPEG quality (1-95)
+        
+    Returns:
+        Tuple of (encoded bytes, MIME type)
+    """
+    fmt = fmt.lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if max_dim is None and fmt == "png":
+        return raw, "image/png"
+    
+    # Imported here so Pillow is only loaded when re-encoding is requested
+    from PIL import Image
+    
+    image = Image.open(io.BytesIO(raw))
+    if max_dim:
+        image.thumbnail((max_dim, max_dim))
+    out = io.BytesIO()
+    if fmt == "jpeg":
+        image.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(out, format="PNG")
+    return out.getvalue(), f"image/{fmt}"
+
+
+MINICAP_REMOTE_DIR = "/data/local/tmp"
+
+
+def start_minicap(adb_path: str, minicap_dir: str, port: int = 1313) -> Optional[subprocess.Popen]:
+    """Push and launch minicap on the device and forward its socket.
+    
+    minicap_dir must contain the 'minicap' binary and 'minicap.so' built for
+    the device's ABI and SDK level.
+    
+    Args:
+        adb_path: Path to ADB executable
+        minicap_dir: Local directory containing minicap and minicap.so
+        port: Local TCP port to forward to the minicap socket
+        
+    Returns:
+        The running minicap process, or None if it could not be started
+    """
+    try:
+        for name in ("minicap", "minicap.so"):
+            local = os.path.join(minicap_dir, name)
+            if not os.path.exists(local):
+                print(f"⚠️ {local} not found - minicap disabled")
+                return None
+            subprocess.run([adb_path, "push", local, f"{MINICAP_REMOTE_DIR}/{name}"],
+                           check=True, capture_output=True)
+        subprocess.run([adb_path, "shell", f"chmod 755 {MINICAP_REMOTE_DIR}/minicap"],
+                       check=True, capture_output=True)
+        
+        width, height = get_device_size(adb_path)
+        proc = subprocess.Popen(
+            [adb_path, "shell",
+             f"LD_LIBRARY_PATH={MINICAP_REMOTE_DIR} {MINICAP_REMOTE_DIR}/minicap "
+             f"-P {width}x{height}@{width}x{height}/0 -S"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        subprocess.run([adb_path, "forward", f"tcp:{port}", "localabstract:minicap"],
+                       check=True, capture_output=True)
+        print(f"✅ minicap started on tcp:{port}")
+        return proc
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"⚠️ Failed to start minicap: {e}")
+        return None
+
+
+class MinicapClient:
+    """Reads JPEG frames from a forwarded minicap socket.
+    
+    A background thread keeps only the most recent frame, so get_frame
+    returns the current screen without waiting for a new capture.
+    
+    Attributes:
+        banner: Parsed minicap banner fields
+    """
+    
+    _BANNER = struct.Struct("<BBIIIIIBB")
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 1313) -> None:
+        """Connect to minicap and start reading frames.
+        
+        Args:
+            host: Host the minicap socket is forwarded to
+            port: Forwarded TCP port
+        """
+        self._sock = socket.create_connection((host, port), timeout=5)
+        self._frame: Optional[bytes] = None
+        self._ready = threading.Event()
+        self._closed = False
+        
+        version, length, pid, real_w, real_h, virt_w, virt_h, orientation, quirks = \
+            self._BANNER.unpack(self._recv_exact(self._BANNER.size))
+        self.banner = {
+            "version": version,
+            "pid": pid,
+            "real_width": real_w,
+            "real_height": real_h,
+            "virtual_width": virt_w,
+            "virtual_height": virt_h,
+            "orientation": orientation * 90,
+            "quirks": quirks
+        }
+        # Skip any banner bytes added by newer minicap versions
+        if length > self._BANNER.size:
+            self._recv_exact(length - self._BANNER.size)
+        
+        self._sock.settimeout(None)
+        self._thread = threading.Thread(target=self._read_frames, daemon=True)
+        self._thread.start()
+    
+    def _recv_exact(self, size: int) -> bytes:
+        """Read exactly size bytes from the socket."""
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = self._sock.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionError("minicap socket closed")
+            buf += chunk
+        return bytes(buf)
+    
+    def _read_frames(self) -> None:
+        """Background loop storing the latest frame."""
+        try:
+            while not self._closed:
+                (size,) = struct.unpack("<I", self._recv_exact(4))
+                self._frame = self._recv_exact(size)
+                self._ready.set()
+        except (OSError, ConnectionError):
+            self._closed = True
+            self._ready.set()
+    
+    def get_frame(self, timeout: float = 2.0) -> bytes:
+        """Return the most recent JPEG frame.
+        
+        Args:
+            timeout: Seconds to wait for the first frame
+            
+        Returns:
+            JPEG bytes of the current screen
+            
+        Raises:
+            RuntimeError: If no frame is available
+        """
+        self._ready.wait(timeout)
+        if self._closed or self._frame is None:
+            raise RuntimeError("No minicap frame available")
+        return self._frame
+    
+    def close(self) -> None:
+        """Close the socket and stop the reader thread."""
+        self._closed = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+def get_ui_hierarchy(adb_path: str, session: Optional[AdbSession] = None) -> Optional[ET.Element]:
+    """Dump the current view hierarchy with uiautomator.
+    
+    Args:
+        adb_path: Path to ADB executable
+        session: Optional persistent shell session
+        
+    Returns:
+        Root element of the hierarchy, or None if the dump failed
+    """
+    try:
+        output = _shell(adb_path, "uiautomator dump /dev/tty", session)
+        start = output.find("<?xml")
+        end = output.rfind(">")
+        if start < 0 or end < start:
+            return None
+        return ET.fromstring(output[start:end + 1])
+    except (ET.ParseError, RuntimeError) as e:
+        print(f"⚠️ Failed to dump UI hierarchy: {e}")
+        return None
+
+
+# Views whose children are interchangeable items; repeats are counted once
+_LIST_VIEW_SUFFIXES = ("ListView", "RecyclerView", "GridView")
+
+
+def structure_hash(view: ET.Element) -> bytes:
+    """Hash the structure of a view tree, ignoring text and bounds.
+    
+    Each view hashes its class together with the sorted hashes of its
+    children, so the result does not depend on child order. Under list-like
+    views duplicate child hashes are dropped, so scrolling a list to show a
+    different number of identical rows yields the same hash.
+    
+    Args:
+        view: Root of the view tree (uiautomator XML element)
+        
+    Returns:
+        16-byte blake2b digest of the structure
+    """
+    view_class = view.get("class", view.tag)
+    child_hashes = sorted(structure_hash(child) for child in view)
+    if view_class.endswith(_LIST_VIEW_SUFFIXES):
+        child_hashes = sorted(set(child_hashes))
+    return hashlib.blake2b(view_class.encode() + b"".join(child_hashes), digest_size=16).digest()
+
+
+def wait_for_app(adb_path: str, package_name: str, timeout: float = 2.0, interval: float = 0.1,
+                 session: Optional[AdbSession] = None) -> bool:
+    """Wait until an app's window has focus, returning as soon as it does.
+    
+    Args:
+        adb_path: Path to ADB executable
+        package_name: Package name of the app to wait for
+        timeout: Maximum time to wait in seconds
+        interval: Delay between focus checks in seconds
+        session: Optional persistent shell session
+        
+    Returns:
+        bool: Whether the app came to the foreground within the timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if package_name in _shell(adb_path, "dumpsys window | grep mCurrentFocus", session):
+                return True
+        except Exception as e:
+            print(f"⚠️ Focus check failed: {e}")
+        if time.monotonic() >= deadline:
+            print(f"⚠️ {package_name} not in foreground after {timeout}s")
+            return False
+        time.sleep(interval)
+
+
+def wait_for_activity(adb_path: str, package: str, timeout: float = 5.0, interval: float = 0.1,
+                      session: Optional[AdbSession] = None) -> bool:
+    """Wait until an activity of a package is resumed, returning as soon as it is.
+    
+    Stricter than wait_for_app: the activity has finished starting, not just
+    taken window focus.
+    
+    Args:
+        adb_path: Path to ADB executable
+        package: Package name of the app to wait for
+        timeout: Maximum time to wait in seconds
+        interval: Delay between checks in seconds
+        session: Optional persistent shell session
+        
+    Returns:
+        bool: Whether an activity of the package was resumed within the timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            # Newer Android versions report topResumedActivity instead of mResumedActivity
+            resumed = _shell(
+                adb_path, "dumpsys activity activities | grep -E 'mResumedActivity|topResumedActivity'", session
+            )
+            if f" {package}/" in resumed:
+                return True
+        except Exception as e:
+            print(f"⚠️ Activity check failed: {e}")
+        if time.monotonic() >= deadline:
+            print(f"⚠️ No resumed activity for {package} after {timeout}s")
+            return False
+        time.sleep(interval)
 
 
 def calculate_app_grid_position(adb_path: str, app_index: int, total_apps: int = 20) -> Tuple[int, int]:
@@ -234,7 +538,8 @@ def tap_app_by_index(adb_path: str, app_index: int) -> bool:
     return tap(adb_path, x, y)
 
 
-def tap(adb_path: str, x: float, y: float, device_width: Optional[int] = None, device_height: Optional[int] = None) -> bool:
+def tap(adb_path: str, x: float, y: float, device_width: Optional[int] = None, device_height: Optional[int] = None,
+        session: Optional[AdbSession] = None) -> bool:
     """Tap at specified coordinates with enhanced reliability.
     
     Args:
@@ -243,6 +548,7 @@ def tap(adb_path: str, x: float, y: float, device_width: Optional[int] = None, d
         y: Y coordinate (can be normalized between 0-1)
         device_width: Device width in pixels (if x is normalized)
         device_height: Device height in pixels (if y is normalized)
+        session: Optional persistent shell session
         
     Returns:
         bool: Whether the tap succeeded
@@ -279,15 +585,19 @@ def tap(adb_path: str, x: float, y: float, device_width: Optional[int] = None, d
             if attempt > 0:
                 print(f"Retrying tap (attempt {attempt + 1}/3)...")
                 
-            command = f"{adb_path} shell input tap {x} {y}"
-            result = subprocess.run(command, capture_output=True, text=True, shell=True)
+            if session is not None:
+                session.run(f"input tap {x} {y}")
+                returncode, stderr = session.last_returncode, ""
+            else:
+                returncode, err = _run_adb_quiet([adb_path, "shell", "input", "tap", str(x), str(y)])
+                stderr = err.decode("utf-8", errors="replace")
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("✅ Tap command executed")
                 time.sleep(1.5)  # Increased delay after tap
                 return True
                 
-            print(f"⚠️ Tap attempt {attempt + 1} failed: {result.stderr.strip()}")
+            print(f"⚠️ Tap attempt {attempt + 1} failed: {stderr.strip()}")
             time.sleep(0.5)  # Short delay between retries
             
         print("❌ All tap attempts failed")
@@ -299,7 +609,8 @@ def tap(adb_path: str, x: float, y: float, device_width: Optional[int] = None, d
 
 
 def swipe(adb_path: str, start_x: float, start_y: float, end_x: float, end_y: float, 
-         duration: int = 300, device_width: Optional[int] = None, device_height: Optional[int] = None) -> None:
+         duration: int = 300, device_width: Optional[int] = None, device_height: Optional[int] = None,
+         session: Optional[AdbSession] = None) -> None:
     """Perform swipe gesture.
     
     Args:
@@ -311,6 +622,7 @@ def swipe(adb_path: str, start_x: float, start_y: float, end_x: float, end_y: fl
         duration: Duration of swipe in milliseconds
         device_width: Device width in pixels (if coordinates are normalized)
         device_height: Device height in pixels (if coordinates are normalized)
+        session: Optional persistent shell session
     """
     # If coordinates are normalized (between 0-1), convert to pixels
     if (0 <= start_x <= 1 and 0 <= start_y <= 1 and 
@@ -326,56 +638,71 @@ def swipe(adb_path: str, start_x: float, start_y: float, end_x: float, end_y: fl
         start_x, start_y = int(start_x), int(start_y)
         end_x, end_y = int(end_x), int(end_y)
     
-    command = f"{adb_path} shell input swipe {start_x} {start_y} {end_x} {end_y} {duration}"
-    subprocess.run(command, capture_output=True, text=True, shell=True)
+    if session is not None:
+        session.run(f"input swipe {start_x} {start_y} {end_x} {end_y} {duration}")
+    else:
+        _run_adb_quiet([adb_path, "shell", "input", "swipe",
+                        str(start_x), str(start_y), str(end_x), str(end_y), str(duration)])
     time.sleep(1)  # Wait for UI to respond
 
 
-def swipe_up(adb_path: str, distance: float = 0.5) -> None:
+def swipe_up(adb_path: str, distance: float = 0.5, session: Optional[AdbSession] = None) -> None:
     """Swipe up from center of screen.
     
     Args:
         adb_path: Path to ADB executable
         distance: Distance to swipe as a fraction of screen height (0-1)
+        session: Optional persistent shell session
     """
     width, height = get_device_size(adb_path)
     center_x = width // 2
     start_y = int(height * 0.7)
     end_y = int(height * (0.7 - distance))
     
-    command = f"{adb_path} shell input swipe {center_x} {start_y} {center_x} {end_y} 300"
-    subprocess.run(command, capture_output=True, text=True, shell=True)
+    if session is not None:
+        session.run(f"input swipe {center_x} {start_y} {center_x} {end_y} 300")
+    else:
+        _run_adb_quiet([adb_path, "shell", "input", "swipe",
+                        str(center_x), str(start_y), str(center_x), str(end_y), "300"])
     time.sleep(1)
 
 
-def swipe_down(adb_path: str, distance: float = 0.5) -> None:
+def swipe_down(adb_path: str, distance: float = 0.5, session: Optional[AdbSession] = None) -> None:
     """Swipe down from center of screen.
     
     Args:
         adb_path: Path to ADB executable
         distance: Distance to swipe as a fraction of screen height (0-1)
+        session: Optional persistent shell session
     """
     width, height = get_device_size(adb_path)
     center_x = width // 2
     start_y = int(height * 0.3)
     end_y = int(height * (0.3 + distance))
     
-    command = f"{adb_path} shell input swipe {center_x} {start_y} {center_x} {end_y} 300"
-    subprocess.run(command, capture_output=True, text=True, shell=True)
+    if session is not None:
+        session.run(f"input swipe {center_x} {start_y} {center_x} {end_y} 300")
+    else:
+        _run_adb_quiet([adb_path, "shell", "input", "swipe",
+                        str(center_x), str(start_y), str(center_x), str(end_y), "300"])
     time.sleep(1)
 
 
-def type_text(adb_path: str, text: str) -> None:
+def type_text(adb_path: str, text: str, session: Optional[AdbSession] = None) -> None:
     """Type specified text.
     
     Args:
         adb_path: Path to ADB executable
         text: Text to type
+        session: Optional persistent shell session
     """
-    # Replace spaces with %s for ADB
-    text = text.replace(' ', '%s')
-    command = f"{adb_path} shell input text \"{text}\""
-    subprocess.run(command, capture_output=True, text=True, shell=True)
+    # Replace spaces with %s for ADB, then quote for the device shell so
+    # quotes, $(...) and backticks in the text are typed rather than run
+    text = shlex.quote(text.replace(' ', '%s'))
+    if session is not None:
+        session.run(f"input text {text}")
+    else:
+        _run_adb_quiet([adb_path, "shell", "input", "text", text])
     time.sleep(0.5)
 
 
@@ -512,25 +839,45 @@ def smart_type_text(adb_path: str, text: str, x: float = None, y: float = None)
     return True
 
 
-def press_back(adb_path: str) -> None:
+def press_back(adb_path: str, session: Optional[AdbSession] = None) -> None:
     """Press back button.
     
     Args:
         adb_path: Path to ADB executable
+        session: Optional persistent shell session
     """
-    command = f"{adb_path} shell input keyevent 4"
-    subprocess.run(command, capture_output=True, text=True, shell=True)
+    if session is not None:
+        session.run("input keyevent 4")
+    else:
+        _run_adb_quiet([adb_path, "shell", "input", "keyevent", "4"])
     time.sleep(1)
 
 
-def press_home(adb_path: str) -> None:
+def press_key(adb_path: str, key: int, session: Optional[AdbSession] = None) -> None:
+    """Send a key event.
+    
+    Args:
+        adb_path: Path to ADB executable
+        key: Android key code
+        session: Optional persistent shell session
+    """
+    if session is not None:
+        session.run(f"input keyevent {key}")
+    else:
+        _run_adb_quiet([adb_path, "shell", "input", "keyevent", str(key)])
+
+
+def press_home(adb_path: str, session: Optional[AdbSession] = None) -> None:
     """Press home button.
     
     Args:
         adb_path: Path to ADB executable
+        session: Optional persistent shell session
     """
-    command = f"{adb_path} shell input keyevent 3"
-    subprocess.run(command, capture_output=True, text=True, shell=True)
+    if session is not None:
+        session.run("input keyevent 3")
+    else:
+        _run_adb_quiet([adb_path, "shell", "input", "keyevent", "3"])
     time.sleep(1)
 
 
@@ -547,13 +894,13 @@ def launch_app(adb_path: str, package_name: str, activity: Optional[str] = None)
     """
     try:
         if activity:
-            command = f"{adb_path} shell am start -n {package_name}/{activity}"
+            command = [adb_path, "shell", "am", "start", "-n", f"{package_name}/{activity}"]
             print(f"🚀 Launching app with activity: {package_name}/{activity}")
         else:
-            command = f"{adb_path} shell monkey -p {package_name} -c android.intent.category.LAUNCHER 1"
+            command = [adb_path, "shell", "monkey", "-p", package_name, "-c", "android.intent.category.LAUNCHER", "1"]
             print(f"🚀 Launching app via monkey: {package_name}")
         
-        result = subprocess.run(command, capture_output=True, text=True, shell=True)
+        result = subprocess.run(command, capture_output=True, text=True)
         
         # Check for success indications in the output
         if result.returncode == 0:
@@ -583,8 +930,9 @@ def launch_app(adb_path: str, package_name: str, activity: Optional[str] = None)
         else:
             print(f"⚠️ Launch may have failed - current app: {current_app}")
             # Try an alternative approach for launching
-            alt_command = f"{adb_path} shell am start -a android.intent.action.MAIN -c android.intent.category.LAUNCHER -n {package_name}/."
-            alt_result = subprocess.run(alt_command, capture_output=True, text=True, shell=True)
+            alt_command = [adb_path, "shell", "am", "start", "-a", "android.intent.action.MAIN",
+                           "-c", "android.intent.category.LAUNCHER", "-n", f"{package_name}/."]
+            alt_result = subprocess.run(alt_command, capture_output=True, text=True)
             
             if alt_result.returncode == 0:
                 print(f"✅ Alternative launch method succeeded")
@@ -599,11 +947,12 @@ def launch_app(adb_path: str, package_name: str, activity: Optional[str] = None)
         return False
 
 
-def get_current_app(adb_path: str) -> str:
+def get_current_app(adb_path: str, session: Optional[AdbSession] = None) -> str:
     """Get package name of current foreground app.
     
     Args:
         adb_path: Path to ADB executable
+        session: Optional persistent shell session
         
     Returns:
         Package name of current app
@@ -613,10 +962,7 @@ def get_current_app(adb_path: str) -> str:
     # First: Try direct manual check for popular apps by listing packages
     try:
         # Directly check if Chrome is running
-        command = f"{adb_path} shell ps | grep chrome"
-        result = subprocess.run(command, capture_output=True, text=True, shell=True)
-        
-        output = result.stdout.strip()
+        output = _shell(adb_path, "ps | grep chrome", session).strip()
         if "com.android.chrome" in output:
             print(f"📱 Detected Chrome directly from running processes")
             return "com.android.chrome"
@@ -625,10 +971,7 @@ def get_current_app(adb_path: str) -> str:
     
     # Method 1: Page-focused activity using a simpler direct command
     try:
-        command = f"{adb_path} shell \"dumpsys window | grep mCurrentFocus\""
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        
-        output = result.stdout.strip()
+        output = _shell(adb_path, "dumpsys window | grep mCurrentFocus", session).strip()
         print(f"📊 Raw current focus data: {output}")
         
         if "com." in output:
@@ -649,10 +992,7 @@ def get_current_app(adb_path: str) -> str:
     
     # Method 2: Get app info from task information
     try:
-        command = f"{adb_path} shell \"dumpsys activity activities | grep ResumedActivity\""
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        
-        output = result.stdout.strip()
+        output = _shell(adb_path, "dumpsys activity activities | grep ResumedActivity", session).strip()
         print(f"📊 Raw resumed activity data: {output}")
         
         if "com." in output:
@@ -671,10 +1011,7 @@ def get_current_app(adb_path: str) -> str:
     
     # Method 3: List recent tasks
     try:
-        command = f"{adb_path} shell \"dumpsys activity recents\""
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        
-        output = result.stdout.strip()
+        output = _shell(adb_path, "dumpsys activity recents", session).strip()
         # Look for Chrome specifically
         if "com.android.chrome" in output:
             print(f"📱 Detected Chrome in recent tasks")
@@ -706,9 +1043,7 @@ def get_current_app(adb_path: str) -> str:
     }
     
     try:
-        command = f"{adb_path} shell \"ps\""
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        output = result.stdout.strip().lower()
+        output = _shell(adb_path, "ps", session).strip().lower()
         
         for keyword, package in known_apps.items():
             if keyword in output and package in output:
@@ -743,58 +1078,240 @@ def get_current_app(adb_path: str) -> str:
     return common_launchers[0]
 
 
-def is_keyboard_visible(adb_path: str) -> bool:
-    """Check if the keyboard is currently visible on screen.
+# Screen heights (fraction of a 2400px screen) where "Use without an account" usually is
+FIRSTRUN_TAP_YS = (0.75, 0.8, 0.85)
+
+_FIRSTRUN_RE = re.compile(r"firstrun", re.IGNORECASE)
+
+
+def launch_chrome(adb_path: str, skip_setup: bool = False, session: Optional[AdbSession] = None) -> bool:
+    """Launch Chrome with first-run handling.
     
     Args:
         adb_path: Path to ADB executable
+        skip_setup: Whether to try skipping first-run setup
+        session: Optional persistent shell session (AdbSession or AdbClient);
+            a temporary AdbSession is used if None
         
     Returns:
-        bool: Whether the keyboard is visible
+        bool: True if Chrome launched successfully
     """
-    print("⌨️ Checking if keyboard is visible...")
+    if session is None:
+        with AdbSession(adb_path) as temp_session:
+            return launch_chrome(adb_path, skip_setup, temp_session)
+    
+    print("\n🌐 Launching Chrome with first-run handling...")
+    
+    # First try direct launch with flags to skip first-run
+    if skip_setup:
+        try:
+            output = session.run(
+                "am start -a android.intent.action.VIEW -d \"about:blank\" "
+                "-n com.android.chrome/com.google.android.apps.chrome.Main "
+                "--es \"com.android.chrome.firstrun.skip\" \"true\""
+            )
+            
+            if session.last_returncode == 0 and "Error" not in output:
+                print("✅ Chrome launched with skip-first-run flag")
+                # Wait for Chrome to load
+                wait_for_app(adb_path, "com.android.chrome", timeout=3.0, session=session)
+                return True
+        except Exception as e:
+            print(f"⚠️ Direct launch failed: {e}")
     
-    # Method 1: Check input method service state
+    # If direct launch fails, try standard launch
     try:
-        command = f"{adb_path} shell dumpsys input_method | grep mInputShown"
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        
-        output = result.stdout.strip()
-        print(f"⌨️ Keyboard state data: {output}")
+        output = session.run(
+            "am start -a android.intent.action.VIEW -d \"about:blank\" "
+            "-n com.android.chrome/com.google.android.apps.chrome.Main"
+        )
         
-        if "mInputShown=true" in output:
-            print("✅ Keyboard is visible (method 1)")
+        if session.last_returncode == 0 and "Error" not in output:
+            print("✅ Chrome launched with standard command")
+            wait_for_app(adb_path, "com.android.chrome", timeout=3.0, session=session)
+            
+            # Check if we're in first-run screen
+            current_app = get_current_app(adb_path, session=session)
+            if _FIRSTRUN_RE.search(current_app):
+                print("⚠️ First-run screen detected - attempting to bypass")
+                # Try tapping "Use without an account" at different positions in one
+                # shell call, stopping as soon as the focused window leaves first-run.
+                # The loop prints nothing until it ends, which can take longer than
+                # the session's default timeout, so it gets its own
+                taps = " ".join(str(int(2400 * y)) for y in FIRSTRUN_TAP_YS)
+                focus = session.run(
+                    f"for y in {taps}; do input tap 540 $y; sleep 1; "
+                    "dumpsys window | grep mCurrentFocus | grep -qi firstrun || break; done; "
+                    "dumpsys window | grep mCurrentFocus",
+                    timeout=15
+                )
+                if focus.strip() and not _FIRSTRUN_RE.search(focus):
+                    print("✅ Successfully bypassed first-run screen")
+                    return True
+                
+                # Batched taps didn't get past it - retry one tap at a time,
+                # polling focus for up to a second after each tap so a tap that
+                # worked is seen as soon as the screen changes. Each check
+                # finishes before the next tap is sent.
+                for y in FIRSTRUN_TAP_YS:
+                    session.run(f"input tap 540 {int(2400 * y)}")
+                    deadline = time.monotonic() + 1.0
+                    while True:
+                        time.sleep(0.2)
+                        
+                        # Check if we're out of first-run
+                        try:
+                            current_app = get_current_app(adb_path, session=session)
+                        except Exception as e:
+                            print(f"⚠️ Focus check failed: {e}")
+                            break
+                        if not _FIRSTRUN_RE.search(current_app):
+                            print("✅ Successfully bypassed first-run screen")
+                            return True
+                        if time.monotonic() >= deadline:
+                            break
+                
+                print("⚠️ Could not bypass first-run screen")
+                return False
+            
             return True
     except Exception as e:
-        print(f"⚠️ Method 1 keyboard detection failed: {e}")
+        print(f"⚠️ Standard launch failed: {e}")
     
-    # Method 2: Check window visibility
-    try:
-        command = f"{adb_path} shell dumpsys window | grep -E 'mHasSurface=true.*InputMethod'"
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+    return False
+
+
+@functools.lru_cache(maxsize=32)
+def get_device_size_cached(adb_path: str) -> Tuple[int, int]:
+    """Memoized get_device_size for callers that don't expect the screen size to change.
+    
+    Args:
+        adb_path: Path to ADB executable
         
-        if result.stdout.strip():
-            print("✅ Keyboard is visible (method 2)")
-            return True
-    except Exception as e:
-        print(f"⚠️ Method 2 keyboard detection failed: {e}")
+    Returns:
+        Tuple containing width and height of device screen
+    """
+    return get_device_size(adb_path)
+
+
+_KEYBOARD_CACHE_TTL = 0.25
+_keyboard_cache: Dict[Tuple[str, Optional[str]], Tuple[float, bool]] = {}
+
+# Keyboard probes run in one shell call and stop at the first hit: the small IME
+# window dump first, then the original input_method and window checks for
+# devices that don't report the IME window's visibility
+_KEYBOARD_PROBE_SCRIPT = (
+    "if dumpsys window InputMethod | grep -q -E 'isOnScreen=true|isVisible=true'; then echo ime_window; "
+    "elif dumpsys input_method | grep -q 'mInputShown=true'; then echo input_method; "
+    "elif dumpsys window | grep -q -E 'mHasSurface=true.*InputMethod'; then echo has_surface; "
+    "elif dumpsys window windows | grep -q -E 'Window #.*InputMethod'; then echo window_list; "
+    "else echo none; fi"
+)
+
+
+def _keyboard_cache_key(adb_path: str, session: Optional[AdbSession] = None) -> Tuple[str, Optional[str]]:
+    """Key keyboard results by device, so two serials don't share a cached result."""
+    serial = getattr(session, "serial", None) or os.environ.get("ANDROID_SERIAL")
+    return adb_path, serial
+
+
+def _invalidate_keyboard_cache(adb_path: str, session: Optional[AdbSession] = None) -> None:
+    """Forget the cached is_keyboard_visible result after the keyboard state may have changed."""
+    _keyboard_cache.pop(_keyboard_cache_key(adb_path, session), None)
+
+
+def is_keyboard_visible(adb_path: str, session: Optional[AdbSession] = None) -> bool:
+    """Check if the keyboard is currently visible on screen.
     
-    # Method 3: Check for specific window names
-    try:
-        command = f"{adb_path} shell dumpsys window windows | grep -E 'Window #.*InputMethod'"
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+    Results are cached per device for 250 ms, so back-to-back checks (e.g. a
+    keyboard check right before cleanup) only hit the device once.
+    
+    Args:
+        adb_path: Path to ADB executable
+        session: Optional persistent shell session
         
-        if result.stdout.strip():
-            print("✅ Keyboard is visible (method 3)")
-            return True
+    Returns:
+        bool: Whether the keyboard is visible
+    """
+    key = _keyboard_cache_key(adb_path, session)
+    cached = _keyboard_cache.get(key)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < _KEYBOARD_CACHE_TTL:
+        return cached[1]
+    
+    print("⌨️ Checking if keyboard is visible...")
+    visible = False
+    try:
+        method = _shell(adb_path, _KEYBOARD_PROBE_SCRIPT, session).strip()
+        visible = method not in ("", "none")
+        if visible:
+            print(f"✅ Keyboard is visible ({method})")
     except Exception as e:
-        print(f"⚠️ Method 3 keyboard detection failed: {e}")
+        print(f"⚠️ Keyboard detection failed: {e}")
     
-    print("❌ Keyboard is not visible")
-    return False
+    if not visible:
+        print("❌ Keyboard is not visible")
+    _keyboard_cache[key] = (now, visible)
+    return visible
+
+
+async def _shell_async(adb_path: str, cmd: str) -> str:
+    """Run a device shell command without blocking the event loop.
+    
+    Args:
+        adb_path: Path to ADB executable
+        cmd: Command line to run in the device shell
+        
+    Returns:
+        The command's stdout
+    """
+    proc = await asyncio.create_subprocess_exec(
+        adb_path, "shell", cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await proc.communicate()
+    return stdout.decode("utf-8", errors="replace")
+
+
+async def is_keyboard_visible_async(adb_path: str) -> bool:
+    """Async variant of is_keyboard_visible.
+    
+    Args:
+        adb_path: Path to ADB executable
+        
+    Returns:
+        bool: Whether the keyboard is visible
+    """
+    method = (await _shell_async(adb_path, _KEYBOARD_PROBE_SCRIPT)).strip()
+    return method not in ("", "none")
 
 
-def wait_for_keyboard(adb_path: str, max_wait: int = 3, retry_tap: bool = False, tap_x: float = None, tap_y: float = None) -> bool:
+async def capture_screenshot_async(adb_path: str) -> bytes:
+    """Capture a screenshot straight from exec-out without blocking the event loop.
+    
+    Args:
+        adb_path: Path to ADB executable
+        
+    Returns:
+        Raw PNG bytes of the screenshot
+        
+    Raises:
+        RuntimeError: If no image data was returned
+    """
+    proc = await asyncio.create_subprocess_exec(
+        adb_path, "exec-out", "screencap", "-p",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0 or not stdout:
+        raise RuntimeError(f"Screenshot failed: {stderr.decode('utf-8', errors='replace').strip()}")
+    return stdout
+
+
+def wait_for_keyboard(adb_path: str, max_wait: int = 3, retry_tap: bool = False, tap_x: float = None, tap_y: float = None,
+                      session: Optional[AdbSession] = None) -> bool:
     """Wait for keyboard to appear, optionally retrying a tap if it doesn't.
     
     Args:
@@ -803,6 +1320,7 @@ def wait_for_keyboard(adb_path: str, max_wait: int = 3, retry_tap: bool = False,
         retry_tap: Whether to retry tapping if keyboard doesn't appear
         tap_x: X coordinate for retry tap (normalized 0-1)
         tap_y: Y coordinate for retry tap (normalized 0-1)
+        session: Optional persistent shell session
         
     Returns:
         bool: Whether keyboard appeared
@@ -811,7 +1329,7 @@ def wait_for_keyboard(adb_path: str, max_wait: int = 3, retry_tap: bool = False,
     
     # Try for a few seconds
     for i in range(max_wait):
-        if is_keyboard_visible(adb_path):
+        if is_keyboard_visible(adb_path, session=session):
             print(f"✅ Keyboard appeared after {i+1}s")
             return True
         
@@ -825,7 +1343,7 @@ def wait_for_keyboard(adb_path: str, max_wait: int = 3, retry_tap: bool = False,
         
         # Wait again after retry
         for i in range(max_wait):
-            if is_keyboard_visible(adb_path):
+            if is_keyboard_visible(adb_path, session=session):
                 print(f"✅ Keyboard appeared after retry tap and {i+1}s wait")
                 return True
             
@@ -836,26 +1354,27 @@ def wait_for_keyboard(adb_path: str, max_wait: int = 3, retry_tap: bool = False,
     return False
 
 
-def dismiss_keyboard(adb_path: str) -> bool:
+def dismiss_keyboard(adb_path: str, session: Optional[AdbSession] = None) -> bool:
     """Dismiss the keyboard if it's visible.
     
     Args:
         adb_path: Path to ADB executable
+        session: Optional persistent shell session
         
     Returns:
         bool: Whether keyboard was dismissed
     """
-    if not is_keyboard_visible(adb_path):
+    if not is_keyboard_visible(adb_path, session=session):
         print("⌨️ Keyboard already hidden")
         return True
     
     # Try pressing back button to dismiss keyboard
     print("⌨️ Dismissing keyboard with back button...")
-    press_back(adb_path)
+    press_back(adb_path, session=session)
     
     # Check if keyboard is hidden
     time.sleep(0.5)
-    if not is_keyboard_visible(adb_path):
+    if not is_keyboard_visible(adb_path, session=session):
         print("✅ Keyboard dismissed successfully")
         return True
     
@@ -870,9 +1389,86 @@ def dismiss_keyboard(adb_path: str) -> bool:
     
     # Check again
     time.sleep(0.5)
-    if not is_keyboard_visible(adb_path):
+    if not is_keyboard_visible(adb_path, session=session):
         print("✅ Keyboard dismissed with tap method")
         return True
     
     print("❌ Failed to dismiss keyboard")
-    return False
\ No newline at end of file
+    return False
+
+
+def ensure_keyboard_hidden(adb_path: str, session: Optional[AdbSession] = None) -> bool:
+    """Check the keyboard, dismiss it if shown and re-check, in a single shell round-trip.
+    
+    Args:
+        adb_path: Path to ADB executable
+        session: Optional persistent shell session
+        
+    Returns:
+        bool: Whether the keyboard is hidden afterwards
+    """
+    script = (
+        "if dumpsys input_method | grep -q 'mInputShown=true'; then input keyevent 4; sleep 0.2; fi; "
+        "dumpsys input_method | grep -c 'mInputShown=true'"
+    )
+    try:
+        output = _shell(adb_path, script, session).strip()
+    except Exception as e:
+        print(f"⚠️ Keyboard check failed: {e}")
+        return False
+    # The keyboard state may have changed under any cached visibility result
+    _invalidate_keyboard_cache(adb_path, session)
+    lines = output.splitlines()
+    hidden = bool(lines) and lines[-1].strip() == "0"
+    print("⌨️ Keyboard hidden" if hidden else "⚠️ Keyboard still visible")
+    return hidden
+
+
+def check_and_dismiss_keyboard(adb_path: str, session: Optional[AdbSession] = None) -> bool:
+    """Dismiss the keyboard if it is shown, checking and dismissing in a single shell round-trip.
+    
+    Args:
+        adb_path: Path to ADB executable
+        session: Optional persistent shell session
+        
+    Returns:
+        bool: Whether the keyboard was shown and got dismissed
+    """
+    script = (
+        "if dumpsys input_method | grep -q 'mInputShown=true'; "
+        "then input keyevent 111; echo dismissed; else echo none; fi"
+    )
+    try:
+        output = _shell(adb_path, script, session)
+    except Exception as e:
+        print(f"⚠️ Keyboard check failed: {e}")
+        return False
+    # The keyboard state may have changed under any cached visibility result
+    _invalidate_keyboard_cache(adb_path, session)
+    return "dismissed" in output
+
+
+def cleanup_and_dismiss(adb_path: str, session: Optional[AdbSession] = None) -> bool:
+    """Go to the home screen and hide the keyboard in a single shell round-trip.
+    
+    Args:
+        adb_path: Path to ADB executable
+        session: Optional persistent shell session
+        
+    Returns:
+        bool: Whether the cleanup commands ran
+    """
+    script = (
+        "input keyevent 3; "
+        "if dumpsys input_method | grep -q 'mInputShown=true'; then input keyevent 111; fi"
+    )
+    try:
+        if session is not None:
+            session.run(script)
+            return session.last_returncode == 0
+        # adb joins shell arguments with spaces, so pass the script as one argument
+        result = subprocess.run([adb_path, "shell", script], capture_output=True, text=True)
+        return result.returncode == 0
+    except Exception as e:
+        print(f"⚠️ Cleanup failed: {e}")
+        return False
@@ -11,9 +11,19 @@ class AndroidState:
         height: Screen height in pixels
         current_app: Package name of the current foreground app
         timestamp: Timestamp when the state was captured
+        raw_bytes: Raw PNG bytes of the screenshot
+        screenshot_hash: blake2b digest of raw_bytes, computed once at capture time
+        keyboard_visible: Keyboard visibility probed alongside the screenshot, if known
+        screenshot_mime: MIME type of the screenshot image
+        structure_hash: Hash of the view hierarchy structure, if tracked
     """
     screenshot: str
     width: int
     height: int
     current_app: str
-    timestamp: Optional[float] = None 
\ No newline at end of file
+    timestamp: Optional[float] = None
+    raw_bytes: bytes = b""
+    screenshot_hash: bytes = b""
+    keyboard_visible: Optional[bool] = None
+    screenshot_mime: str = "image/png"
+    structure_hash: bytes = b"" 
\ No newline at end of file
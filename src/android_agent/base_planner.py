@@ -1,14 +1,42 @@
-from typing import List, Optional, Union, Dict, Any
-from .android_action import AndroidAction
+import re
+from typing import Any, Dict, Iterator, List, Optional, Union
+from .android_action import AndroidAction, AndroidActionType
 from .android_state import AndroidState
 from .android_step import AndroidStep
 
+# The closing quote must match the opening one, and quotes inside words
+# (apostrophes as in "don't" or "Chrome's") neither open nor close a quote
+_QUOTED_RE = re.compile(r'(?<!\w)(["\'])(.+?)\1(?!\w)')
+
+
+def extract_query_from_goal(goal: str) -> Optional[str]:
+    """Extract the text to type from a goal, if it names exactly one.
+    
+    Args:
+        goal: The goal to achieve
+        
+    Returns:
+        The quoted text in the goal, or None if there is none or it is ambiguous
+    """
+    queries = {text for _, text in _QUOTED_RE.findall(goal)}
+    if len(queries) != 1:
+        return None
+    return queries.pop()
+
+
 class ActionPlanner:
     """Abstract base class for action planners.
     
     This class defines the interface that all action planners must implement.
     """
     
+    def reset(self) -> None:
+        """Forget per-run state before a new run starts.
+        
+        Planners are reused across runs (several goals, or daemon mode); the
+        default keeps no per-run state.
+        """
+    
     def plan_action(
         self,
         goal: str,
@@ -29,4 +57,59 @@ class ActionPlanner:
         Returns:
             The next action to perform
         """
-        raise NotImplementedError("Subclasses must implement plan_action") 
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement plan_action")
+    
+    def plan_stream(
+        self,
+        goal: str,
+        additional_context: Optional[Union[str, Dict[str, Any]]] = None,
+        additional_instructions: Optional[List[str]] = None,
+        current_state: Optional[AndroidState] = None,
+        session_history: Optional[List[AndroidStep]] = None
+    ) -> Iterator[AndroidAction]:
+        """Plan next actions, yielding each one as soon as it is known.
+        
+        Planners that can produce actions incrementally override this; the
+        default yields the single action from plan_action.
+        
+        Args:
+            goal: The goal to achieve
+            additional_context: Extra context information
+            additional_instructions: Extra instructions
+            current_state: Current device state
+            session_history: History of previous actions and states
+            
+        Yields:
+            Actions to perform, in order
+        """
+        yield self.plan_action(goal, additional_context, additional_instructions, current_state, session_history)
+    
+    def try_shortcut(
+        self,
+        goal: str,
+        tracker: Any,
+        session_history: Optional[List[AndroidStep]] = None
+    ) -> Optional[AndroidAction]:
+        """Return an action that can be decided without planning, if any.
+        
+        Right after an input field was tapped and the keyboard is up, the next
+        action is to type the query named in the goal, so no model call is needed.
+        
+        Args:
+            goal: The goal to achieve
+            tracker: State tracker with the current input state
+            session_history: History of previous actions and states
+            
+        Returns:
+            The action to perform, or None if the planner should decide
+        """
+        if not (tracker.must_type_next and tracker.keyboard_visible):
+            return None
+        query = extract_query_from_goal(goal)
+        if not query:
+            return None
+        # Only type the query once; after that let the planner take over
+        for step in session_history or []:
+            if step.action.action == AndroidActionType.TYPE and step.action.text == query:
+                return None
+        return AndroidAction(action=AndroidActionType.TYPE, text=query)
@@ -4,20 +4,132 @@ This module provides a planner that uses OpenAI's API to analyze screenshots
 and determine appropriate actions to achieve user goals on Android devices.
 """
 
+import asyncio
+import base64
+import dataclasses
+import hashlib
+import importlib.util
 import json
+import logging
 import os
 import re
+import threading
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
 from .base_planner import ActionPlanner
 from .android_action import AndroidAction, AndroidActionType, Coordinate, SwipeCoordinates
 from .android_state import AndroidState
 from .android_step import AndroidStep
 
+logger = logging.getLogger(__name__)
+
+
+# Goal-independent part of the system prompt. Keep this byte-identical across
+# calls: it is sent first so OpenAI's automatic prompt caching can reuse it.
+# The response format differs between text and tool-call planning, so each
+# mode has its own template built on the same rules.
+_SYS_TEMPLATE_RULES = """You are an Android device automation assistant. Your task is to help achieve the goal given in the next system message.
+
+You will analyze screenshots of an Android device to determine the appropriate actions to take.
+You can perform the following actions:
+1. TAP at specific coordinates (normalized from 0-1)
+2. SWIPE from one point to another
+3. SWIPE_UP or SWIPE_DOWN to scroll
+4. TYPE text into input fields
+5. BACK to press the back button
+6. HOME to go to the home screen
+7. LAUNCH_APP to open an application
+8. SUCCESS when the goal is achieved
+9. FAILURE when the goal cannot be achieved
+
+IMPORTANT INSTRUCTIONS:
+- Be precise with tap coordinates, ensuring they are within visible UI elements
+- If an action doesn't work after 2-3 attempts, try a different approach
+- When searching, first find and tap the search bar, then type the search term
+- If you see a keyboard, make sure to tap the search/enter button after typing
+- Avoid repetitive actions that don't lead to progress
+- If stuck, try going back to home screen and starting over
+
+When deciding the next action, think step by step:
+1. Analyze what's currently visible on screen
+2. Identify the next logical step toward the goal
+3. Determine the specific action and parameters needed
+"""
+
+SYS_TEMPLATE_STATIC = _SYS_TEMPLATE_RULES + """
+Your response must be formatted as follows:
+```observation
+[Brief description of what you observe on screen]
+```
+
+```action
+{
+  "action": "[TAP, SWIPE, SWIPE_UP, SWIPE_DOWN, TYPE, BACK, HOME, LAUNCH_APP, SUCCESS, FAILURE]",
+  "x": 0.5,  // For TAP or SWIPE start (normalized 0-1, omit if not needed)
+  "y": 0.5,  // For TAP or SWIPE start (normalized 0-1, omit if not needed)
+  "end_x": 0.5,  // For SWIPE end (normalized 0-1, omit if not needed)
+  "end_y": 0.5,  // For SWIPE end (normalized 0-1, omit if not needed)
+  "text": "text"  // For TYPE or LAUNCH_APP (omit if not needed)
+}
+```
+
+```reasoning
+[Your step-by-step reasoning explaining why this action will help achieve the goal]
+```
+"""
+
+
+# Function-calling schema for planners created with use_tools; arguments use
+# the same fields as the action block in SYS_TEMPLATE_STATIC
+ACTION_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "android_action",
+        "description": "Perform one action on the Android device",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["TAP", "SWIPE", "SWIPE_UP", "SWIPE_DOWN", "TYPE", "BACK", "HOME",
+                             "LAUNCH_APP", "SUCCESS", "FAILURE"]
+                },
+                "x": {"type": "number", "description": "TAP or SWIPE start x, normalized 0-1"},
+                "y": {"type": "number", "description": "TAP or SWIPE start y, normalized 0-1"},
+                "end_x": {"type": "number", "description": "SWIPE end x, normalized 0-1"},
+                "end_y": {"type": "number", "description": "SWIPE end y, normalized 0-1"},
+                "text": {"type": "string", "description": "Text for TYPE or app for LAUNCH_APP"}
+            },
+            "required": ["action"]
+        }
+    }
+}
+
+SYS_TEMPLATE_STATIC_TOOLS = _SYS_TEMPLATE_RULES + """
+Perform actions by calling the android_action tool, once per action.
+When you need multiple independent actions, emit them in a single response; they are executed in the order given.
+
+Also write your observation as message text, formatted as follows:
+```observation
+[Brief description of what you observe on screen]
+```
+"""
+
+
+# Fenced response sections, compiled once and shared by parsing and streaming
+_SECTION_RE = {
+    name: re.compile(rf"```{name}\n(.*?)```", re.DOTALL)
+    for name in ("observation", "action", "reasoning")
+}
+
+# Actions the structure-keyed plan cache may replay (see _store_plan)
+_CACHEABLE_ACTIONS = frozenset({AndroidActionType.TAP, AndroidActionType.PRESS, AndroidActionType.LAUNCH_APP})
+
 
 @dataclass
 class OpenAIPlannerOptions:
@@ -29,12 +141,26 @@ class OpenAIPlannerOptions:
         temperature: Sampling temperature (0-2)
         max_tokens: Maximum tokens in response
         debug: Whether to print debug information
+        stream: Whether to stream the response and stop once the action block closes
+        image_upload_fn: Optional callable that uploads PNG bytes and returns a
+            hosted URL, sent instead of an inline base64 data URI
+        cache_by_structure: Reuse the planned action when the UI structure and goal repeat
+        prompt_cache: Send a prompt_cache_key derived from the system prompt prefix and
+            warn if that prefix changes during a run
+        use_tools: Request actions as tool calls instead of parsing a single action
+            block; plan_stream allows parallel calls, so one response can carry
+            several actions, while plan_action asks for exactly one
     """
     api_key: Optional[str] = None
     model: str = "gpt-4"
     temperature: float = 0.2
     max_tokens: int = 1000
     debug: bool = False
+    stream: bool = True
+    image_upload_fn: Optional[Callable[[bytes], str]] = None
+    cache_by_structure: bool = False
+    prompt_cache: bool = True
+    use_tools: bool = False
 
 
 class OpenAIPlanner(ActionPlanner):
@@ -62,13 +188,93 @@ class OpenAIPlanner(ActionPlanner):
         
         self.options = options
         
+        # Keep one pooled HTTP client so consecutive calls reuse the TLS connection.
+        # openai's own client class is used so the HTTP library it depends on
+        # needn't be imported here. HTTP/2 needs the optional 'h2' package, so
+        # only enable it when present.
+        self._http = DefaultHttpxClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=60
+        )
+        
         # Initialize OpenAI client
-        self.client = OpenAI(api_key=self.options.api_key)
+        self.client = OpenAI(api_key=self.options.api_key, http_client=self._http)
+        
+        # Async client for batched planning, created on first use
+        self._async_client: Optional[AsyncOpenAI] = None
+        
+        # Uploaded screenshot URLs keyed by content hash
+        self._upload_cache: Dict[bytes, str] = {}
+        
+        # Planned actions keyed by (UI structure hash, goal hash), least recent first
+        self._plan_cache: "OrderedDict[Tuple[bytes, bytes], AndroidAction]" = OrderedDict()
+        
+        # Hash of the system prompt prefix sent on the previous call
+        self._prefix_hash: Optional[str] = None
+        
+        # Formatted goal prompts keyed by (goal, instructions, context)
+        self._sys_prompt_cache: Dict[Tuple[str, Tuple[str, ...], str], str] = {}
+    
+    def reset(self) -> None:
+        """Forget the previous run's system prompt prefix, so a new goal doesn't warn."""
+        self._prefix_hash = None
+    
+    def close(self) -> None:
+        """Close the underlying HTTP connection pools.
+        
+        The async client belongs to the event loop that used it and is closed
+        there by aclose() (plan_actions_batch does this itself).
+        """
+        self._http.close()
+    
+    async def aclose(self) -> None:
+        """Close the async client from the event loop that created it."""
+        if self._async_client is None:
+            return
+        async_client, self._async_client = self._async_client, None
+        await async_client.close()
+    
+    def warmup(self) -> threading.Thread:
+        """Open the API connection in the background before the first plan.
+        
+        The TLS handshake then overlaps with device setup instead of
+        delaying the first planning call.
+        
+        Returns:
+            The daemon thread doing the warmup
+        """
+        def _warm() -> None:
+            try:
+                self.client.models.list()
+                logger.debug("🔥 OpenAI connection warmed up")
+            except Exception as e:
+                logger.debug("⚠️ OpenAI warmup failed: %s", e)
+        
+        thread = threading.Thread(target=_warm, daemon=True)
+        thread.start()
+        return thread
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Return the async OpenAI client, creating it on first use."""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self.options.api_key,
+                http_client=DefaultAsyncHttpxClient(
+                    http2=importlib.util.find_spec("h2") is not None,
+                    timeout=60
+                )
+            )
+        return self._async_client
     
     def format_system_prompt(
         self, goal: str, additional_context: str, additional_instructions: List[str]
     ) -> str:
-        """Format system prompt for OpenAI model.
+        """Format the goal-specific part of the system prompt.
+        
+        The framework rules and response format live in SYS_TEMPLATE_STATIC
+        (SYS_TEMPLATE_STATIC_TOOLS with use_tools) and
+        are sent as a separate, byte-identical first system message so OpenAI's
+        automatic prompt caching can reuse them across steps.
         
         Args:
             goal: User's goal to achieve
@@ -76,68 +282,27 @@ class OpenAIPlanner(ActionPlanner):
             additional_instructions: List of additional instructions
             
         Returns:
-            Formatted system prompt
+            Formatted dynamic system prompt
         """
-        instructions = "\n".join(f"* {instruction}" for instruction in additional_instructions)
+        key = (goal, tuple(additional_instructions), str(additional_context))
+        cached = self._sys_prompt_cache.get(key)
+        if cached is not None:
+            return cached
         
-        system_prompt = f"""You are an Android device automation assistant. Your task is to help achieve the following goal:
-
-GOAL: {goal}
-
-You will analyze screenshots of an Android device to determine the appropriate actions to take.
-You can perform the following actions:
-1. TAP at specific coordinates (normalized from 0-1)
-2. SWIPE from one point to another
-3. SWIPE_UP or SWIPE_DOWN to scroll
-4. TYPE text into input fields
-5. BACK to press the back button
-6. HOME to go to the home screen
-7. LAUNCH_APP to open an application
-8. SUCCESS when the goal is achieved
-9. FAILURE when the goal cannot be achieved
-
-IMPORTANT INSTRUCTIONS:
-- Be precise with tap coordinates, ensuring they are within visible UI elements
-- If an action doesn't work after 2-3 attempts, try a different approach
-- When searching, first find and tap the search bar, then type the search term
-- If you see a keyboard, make sure to tap the search/enter button after typing
-- Avoid repetitive actions that don't lead to progress
-- If stuck, try going back to home screen and starting over
-
-Additional context: {additional_context}
-
-"""
-        
-        if instructions:
-            system_prompt += f"\nAdditional instructions:\n{instructions}\n"
-        
-        system_prompt += """
-When deciding the next action, think step by step:
-1. Analyze what's currently visible on screen
-2. Identify the next logical step toward the goal
-3. Determine the specific action and parameters needed
-
-Your response must be formatted as follows:
-```observation
-[Brief description of what you observe on screen]
-```
-
-```action
-{
-  "action": "[TAP, SWIPE, SWIPE_UP, SWIPE_DOWN, TYPE, BACK, HOME, LAUNCH_APP, SUCCESS, FAILURE]",
-  "x": 0.5,  // For TAP or SWIPE start (normalized 0-1, omit if not needed)
-  "y": 0.5,  // For TAP or SWIPE start (normalized 0-1, omit if not needed)
-  "end_x": 0.5,  // For SWIPE end (normalized 0-1, omit if not needed)
-  "end_y": 0.5,  // For SWIPE end (normalized 0-1, omit if not needed)
-  "text": "text"  // For TYPE or LAUNCH_APP (omit if not needed)
-}
-```
-
-```reasoning
-[Your step-by-step reasoning explaining why this action will help achieve the goal]
-```
-"""
+        # Instructions come before the goal: they start with the same defaults
+        # in every run, so that part of the prefix is cacheable across goals
+        parts = []
+        if additional_instructions:
+            parts.append("Additional instructions:\n")
+            for instruction in additional_instructions:
+                parts.append(f"* {instruction}\n")
+            parts.append("\n")
+        parts.append(f"GOAL: {goal}\n\nAdditional context: {additional_context}\n")
+        system_prompt = "".join(parts)
         
+        if len(self._sys_prompt_cache) >= 64:
+            self._sys_prompt_cache.clear()
+        self._sys_prompt_cache[key] = system_prompt
         return system_prompt
     
     def format_message_content(
@@ -157,7 +322,7 @@ Your response must be formatted as follows:
             {
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/png;base64,{current_state.screenshot}"
+                    "url": self._image_url(current_state)
                 }
             },
             {
@@ -193,6 +358,37 @@ Your response must be formatted as follows:
         
         return content
     
+    def _image_url(self, current_state: AndroidState) -> str:
+        """Return the URL to send for the state's screenshot.
+        
+        Uses the configured upload function when there is one, uploading each
+        distinct screenshot only once, and an inline data URI otherwise.
+        
+        Args:
+            current_state: Current device state
+            
+        Returns:
+            Hosted image URL or base64 data URI
+        """
+        data_uri = f"data:{current_state.screenshot_mime};base64,{current_state.screenshot}"
+        upload_fn = self.options.image_upload_fn
+        if upload_fn is None:
+            return data_uri
+        
+        png = current_state.raw_bytes or base64.b64decode(current_state.screenshot)
+        key = current_state.screenshot_hash or hashlib.blake2b(png, digest_size=16).digest()
+        url = self._upload_cache.get(key)
+        if url is None:
+            try:
+                url = upload_fn(png)
+            except Exception as e:
+                logger.warning("⚠️ Screenshot upload failed, sending inline: %s", e)
+                return data_uri
+            if len(self._upload_cache) >= 256:
+                self._upload_cache.clear()
+            self._upload_cache[key] = url
+        return url
+    
     def parse_action_response(self, response_text: str) -> AndroidAction:
         """Parse OpenAI response into an AndroidAction.
         
@@ -212,7 +408,7 @@ Your response must be formatted as follows:
                 return self._infer_action_from_text(response_text)
             
             json_text = json_match.group(1)
-            print(f"✅ Found JSON: {json_text}")
+            logger.debug("✅ Found JSON: %s", json_text)
             
             try:
                 action_json = json.loads(json_text)
@@ -221,6 +417,26 @@ Your response must be formatted as follows:
                 print(f"📝 JSON text: {json_text}")
                 return self._infer_action_from_text(response_text)
             
+            return self._action_from_json(action_json, response_text)
+                
+        except Exception as e:
+            print(f"❌ Error parsing action response: {e}")
+            # Print traceback for debugging
+            import traceback
+            traceback.print_exc()
+            return self._infer_action_from_text(response_text)
+    
+    def _action_from_json(self, action_json: Dict[str, Any], response_text: str) -> AndroidAction:
+        """Convert a parsed action object into an AndroidAction.
+        
+        Args:
+            action_json: Action object from an action block or tool call
+            response_text: Full response text, used to infer an action if the object is unusable
+            
+        Returns:
+            Parsed AndroidAction
+        """
+        try:
             # Create mapping from various action names to correct enum values
             action_map = {
                 "tap": AndroidActionType.TAP,
@@ -723,81 +939,481 @@ Your response must be formatted as follows:
             The next action to perform
         """
         if not current_state:
-            print("❌ No current state provided")
+            logger.error("❌ No current state provided")
             return AndroidAction(action=AndroidActionType.FAILURE)
         
+        cache_key = self._plan_cache_key(goal, current_state)
+        cached = self._lookup_plan(cache_key, current_state, session_history)
+        if cached is not None:
+            return cached
+        
         try:
-            # Prepare conversation context
-            system_prompt = self.format_system_prompt(
-                goal,
-                additional_context or "",
-                additional_instructions or []
+            messages = self._build_messages(
+                goal, additional_context, additional_instructions, current_state, session_history
             )
-            print(f"🔵 System prompt length: {len(system_prompt)} characters")
             
-            # Prepare message content including screenshot
-            content = self.format_message_content(
-                current_state,
-                include_history=True,
-                history=session_history
+            # Make API call
+            logger.debug("🤖 Calling OpenAI API for action plan...")
+            if self.options.use_tools:
+                # Only one action is returned here, so don't ask for parallel
+                # calls; plan_stream requests and yields multi-action plans
+                action = self._request_tool_actions(messages, current_state, parallel=False)[0]
+            else:
+                response_text = self._request_completion(messages)
+                action = self._handle_response(response_text, current_state)
+            
+            self._store_plan(cache_key, action)
+            return action
+            
+        except Exception as e:
+            logger.error("❌ Error in plan_action: %s", e, exc_info=True)
+            return AndroidAction(action=AndroidActionType.FAILURE)
+    
+    def plan_stream(
+        self,
+        goal: str,
+        additional_context: Optional[Union[str, Dict[str, Any]]] = None,
+        additional_instructions: Optional[List[str]] = None,
+        current_state: Optional[AndroidState] = None,
+        session_history: Optional[List[AndroidStep]] = None
+    ) -> Iterator[AndroidAction]:
+        """Plan actions, yielding each one as soon as its action block closes.
+        
+        The caller can execute an action while the rest of the response is
+        still being generated. Reading stops once the reasoning section
+        starts, since no further actions follow it.
+        
+        Args:
+            goal: The goal to achieve
+            additional_context: Extra context information
+            additional_instructions: Extra instructions
+            current_state: Current device state
+            session_history: History of previous actions and states
+            
+        Yields:
+            Actions to perform, in order
+        """
+        cache_key = self._plan_cache_key(goal, current_state) if current_state else None
+        cached = self._lookup_plan(cache_key, current_state, session_history)
+        if cached is not None:
+            yield cached
+            return
+        if self.options.use_tools and current_state:
+            try:
+                messages = self._build_messages(
+                    goal, additional_context, additional_instructions, current_state, session_history
+                )
+                actions = self._request_tool_actions(messages, current_state)
+            except Exception as e:
+                logger.error("❌ Error in plan_stream: %s", e, exc_info=True)
+                actions = [AndroidAction(action=AndroidActionType.FAILURE)]
+            if len(actions) == 1:
+                # A replay can only yield one action, so multi-action plans aren't cached
+                self._store_plan(cache_key, actions[0])
+            yield from actions
+            return
+        if not self.options.stream or not current_state:
+            yield self.plan_action(goal, additional_context, additional_instructions, current_state, session_history)
+            return
+        
+        try:
+            messages = self._build_messages(
+                goal, additional_context, additional_instructions, current_state, session_history
+            )
+            logger.debug("🤖 Streaming action plan from OpenAI API...")
+            stream = self.client.chat.completions.create(
+                model=self.options.model,
+                messages=messages,
+                temperature=self.options.temperature,
+                max_tokens=self.options.max_tokens,
+                stream=True,
+                **self._prompt_cache_kwargs(messages, track=True)
             )
-            print(f"🔵 Screenshot base64 size: {len(current_state.screenshot)/1024:.1f} KB")
+        except Exception as e:
+            logger.error("❌ Error in plan_stream: %s", e, exc_info=True)
+            yield AndroidAction(action=AndroidActionType.FAILURE)
+            return
+        
+        buffer = ""
+        pos = 0
+        yielded = 0
+        first_action: Optional[AndroidAction] = None
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                buffer += delta
+                for match in _SECTION_RE["action"].finditer(buffer, pos):
+                    pos = match.end()
+                    if not yielded:
+                        self._record_observation(buffer, current_state)
+                    action = self.parse_action_response(match.group(0))
+                    logger.info("🎯 Selected action: %s", action.action)
+                    if not yielded:
+                        first_action = action
+                    yielded += 1
+                    yield action
+                if yielded and "```reasoning" in buffer[pos:]:
+                    break
+        except Exception as e:
+            logger.error("❌ Error while streaming plan: %s", e, exc_info=True)
+            # A cut-off response may have lost later actions; don't cache it
+            first_action = None
+        finally:
+            stream.close()
+        
+        if yielded == 1 and first_action is not None:
+            # A replay can only yield one action, so multi-action plans aren't cached
+            self._store_plan(cache_key, first_action)
+        
+        if not yielded:
+            # No action block - fall back to inferring the action from the text
+            yield self._handle_response(buffer, current_state)
+        elif self.options.debug:
+            logger.info("📝 Full response: %s", buffer)
+        else:
+            logger.debug("🔄 Full response: %s", buffer)
+    
+    def _lookup_plan(
+        self,
+        cache_key: Optional[Tuple[bytes, bytes]],
+        current_state: Optional[AndroidState],
+        session_history: Optional[List[AndroidStep]]
+    ) -> Optional[AndroidAction]:
+        """Return the cached action for a state, unless it just failed to change the UI.
+        
+        Args:
+            cache_key: Plan cache key of the state
+            current_state: Current device state
+            session_history: History of previous actions and states
             
-            # Prepare messages for API call
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": content}
-            ]
+        Returns:
+            A copy of the cached action, or None if the planner must be asked
+        """
+        if cache_key is None or cache_key not in self._plan_cache:
+            return None
+        if session_history and session_history[-1].state.structure_hash == current_state.structure_hash:
+            # The last action ran on this same structure and left it unchanged;
+            # replaying the cached action would repeat it until the step limit
+            del self._plan_cache[cache_key]
+            return None
+        self._plan_cache.move_to_end(cache_key)
+        action = self._plan_cache[cache_key]
+        logger.info("♻️ Reusing cached action for unchanged UI: %s", action.action)
+        return dataclasses.replace(action)
+    
+    def _store_plan(self, cache_key: Optional[Tuple[bytes, bytes]], action: AndroidAction) -> None:
+        """Remember a planned action for a UI structure, evicting the oldest entry.
+        
+        Only navigation actions are cached. Typing, swiping and waiting change
+        the screen without changing its structure, so replaying them for the
+        same structure would type text twice or scroll forever.
+        """
+        if cache_key is None or action.action not in _CACHEABLE_ACTIONS:
+            return
+        self._plan_cache[cache_key] = dataclasses.replace(action)
+        if len(self._plan_cache) > 500:
+            self._plan_cache.popitem(last=False)
+    
+    def _plan_cache_key(self, goal: str, current_state: AndroidState) -> Optional[Tuple[bytes, bytes]]:
+        """Return the plan cache key for a state, or None if caching doesn't apply."""
+        if not self.options.cache_by_structure or not current_state.structure_hash:
+            return None
+        goal_hash = hashlib.blake2b(goal.encode(), digest_size=8).digest()
+        return (current_state.structure_hash, goal_hash)
+    
+    async def aplan_action(
+        self,
+        goal: str,
+        additional_context: Optional[Union[str, Dict[str, Any]]] = None,
+        additional_instructions: Optional[List[str]] = None,
+        current_state: Optional[AndroidState] = None,
+        session_history: Optional[List[AndroidStep]] = None
+    ) -> AndroidAction:
+        """Async variant of plan_action used for batched planning.
+        
+        The response is requested without streaming; the early stop only
+        matters for a single interactive agent waiting on its next action.
+        
+        Args:
+            goal: The goal to achieve
+            additional_context: Extra context information
+            additional_instructions: Extra instructions
+            current_state: Current device state
+            session_history: History of previous actions and states
             
-            # Make API call
-            print(f"🤖 Calling OpenAI API for action plan...")
-            response = self.client.chat.completions.create(
+        Returns:
+            The next action to perform
+        """
+        if not current_state:
+            logger.error("❌ No current state provided")
+            return AndroidAction(action=AndroidActionType.FAILURE)
+        
+        try:
+            messages = self._build_messages(
+                goal, additional_context, additional_instructions, current_state, session_history
+            )
+            response = await self._get_async_client().chat.completions.create(
                 model=self.options.model,
                 messages=messages,
                 temperature=self.options.temperature,
-                max_tokens=self.options.max_tokens
+                max_tokens=self.options.max_tokens,
+                **self._prompt_cache_kwargs(messages)
             )
+            return self._handle_response(response.choices[0].message.content, current_state)
+            
+        except Exception as e:
+            logger.error("❌ Error in aplan_action: %s", e, exc_info=True)
+            return AndroidAction(action=AndroidActionType.FAILURE)
+    
+    async def plan_actions_batch(
+        self,
+        jobs: Sequence[Tuple[
+            str,
+            Optional[Union[str, Dict[str, Any]]],
+            Optional[List[str]],
+            AndroidState,
+            Optional[List[AndroidStep]]
+        ]],
+        concurrency: int = 8
+    ) -> List[AndroidAction]:
+        """Plan actions for several independent episodes concurrently.
+        
+        The async client is closed before returning, inside the same event loop
+        that opened its connections.
+        
+        Args:
+            jobs: (goal, additional_context, additional_instructions, current_state,
+                session_history) tuples, one per episode
+            concurrency: Maximum number of requests in flight at once
             
-            # Extract response text
-            response_text = response.choices[0].message.content
+        Returns:
+            The planned actions, in the same order as jobs
+        """
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def one(job):
+            goal, additional_context, additional_instructions, current_state, session_history = job
+            async with sem:
+                return await self.aplan_action(
+                    goal, additional_context, additional_instructions, current_state, session_history
+                )
+        
+        try:
+            return list(await asyncio.gather(*(one(job) for job in jobs)))
+        finally:
+            await self.aclose()
+    
+    def _build_messages(
+        self,
+        goal: str,
+        additional_context: Optional[Union[str, Dict[str, Any]]],
+        additional_instructions: Optional[List[str]],
+        current_state: AndroidState,
+        session_history: Optional[List[AndroidStep]]
+    ) -> List[Dict[str, Any]]:
+        """Build the chat messages for a planning request.
+        
+        Args:
+            goal: The goal to achieve
+            additional_context: Extra context information
+            additional_instructions: Extra instructions
+            current_state: Current device state
+            session_history: History of previous actions and states
             
-            # Store the observation section for UI detection
-            observation = self._extract_section(response_text, "observation")
-            if observation:
-                self.last_observation = observation
-                print(f"👁️ OBSERVATION: {observation}")
-            else:
-                self.last_observation = ""
+        Returns:
+            Messages for the chat completions API
+        """
+        # Prepare conversation context
+        system_prompt = self.format_system_prompt(
+            goal,
+            additional_context or "",
+            additional_instructions or []
+        )
+        logger.debug("🔵 System prompt length: %d characters", len(system_prompt))
+        
+        # Prepare message content including screenshot
+        content = self.format_message_content(
+            current_state,
+            include_history=True,
+            history=session_history
+        )
+        logger.debug("🔵 Screenshot size: %.1f KB", len(current_state.raw_bytes) / 1024)
+        
+        # Static prefix first for prompt caching, then the goal it refers to
+        static_prompt = SYS_TEMPLATE_STATIC_TOOLS if self.options.use_tools else SYS_TEMPLATE_STATIC
+        return [
+            {"role": "system", "content": static_prompt},
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": content}
+        ]
+    
+    def _handle_response(self, response_text: str, current_state: AndroidState) -> AndroidAction:
+        """Log the model response and parse it into an action.
+        
+        Args:
+            response_text: Raw response text from the model
+            current_state: Device state the response was planned for
             
-            # Extract reasoning for debugging
+        Returns:
+            The parsed action
+        """
+        self._record_observation(response_text, current_state)
+        
+        # Extract reasoning for debugging
+        if logger.isEnabledFor(logging.DEBUG):
             reasoning = self._extract_section(response_text, "reasoning")
             if reasoning:
-                print(f"🧠 REASONING: {reasoning}")
-            
-            # Parse response to get action
-            action = self.parse_action_response(response_text)
-            
-            # Log full response for debugging
-            if self.options.debug:
-                print(f"📝 Full response: {response_text}")
-            else:
-                print(f"🔄 Full response: {response_text}")
+                logger.debug("🧠 REASONING: %s", reasoning)
+        
+        # Parse response to get action
+        action = self.parse_action_response(response_text)
+        
+        # Log full response for debugging
+        if self.options.debug:
+            logger.info("📝 Full response: %s", response_text)
+        else:
+            logger.debug("🔄 Full response: %s", response_text)
+        
+        # Log action
+        logger.info("🎯 Selected action: %s", action.action)
+        
+        return action
+    
+    def _record_observation(self, response_text: str, current_state: AndroidState) -> None:
+        """Store the observation section for UI detection.
+        
+        Args:
+            response_text: Raw response text from the model
+            current_state: Device state the response was planned for
+        """
+        observation = self._extract_section(response_text, "observation")
+        if observation:
+            self.last_observation = observation
+            logger.info("👁️ OBSERVATION: %s", observation)
+        else:
+            self.last_observation = ""
+        
+        # Special case for Chrome UI detection
+        if "chrome" in self.last_observation.lower() and ("com.android.chrome" not in current_state.current_app):
+            logger.debug("⚠️ Chrome UI detected but not in app name. This may indicate incorrect app detection.")
             
-            # Log action
-            print(f"🎯 Selected action: {action.action}")
+    def _prompt_cache_kwargs(self, messages: List[Dict[str, Any]], track: bool = False) -> Dict[str, Any]:
+        """Build the prompt caching arguments for a request.
+        
+        The key is derived from the system messages, which stay identical for
+        every step of a run, so requests are routed to the same prompt cache.
+        
+        Args:
+            messages: Messages about to be sent
+            track: Whether to warn if the prefix differs from the previous call
             
-            # Special case for Chrome UI detection
-            if "chrome" in self.last_observation.lower() and ("com.android.chrome" not in current_state.current_app):
-                print("⚠️ Chrome UI detected but not in app name. This may indicate incorrect app detection.")
-                
-            return action
+        Returns:
+            Extra keyword arguments for chat.completions.create
+        """
+        if not self.options.prompt_cache:
+            return {}
+        
+        prefix = "".join(m["content"] for m in messages if m["role"] == "system")
+        prefix_hash = hashlib.blake2b(prefix.encode(), digest_size=16).hexdigest()
+        if track:
+            if self._prefix_hash is not None and prefix_hash != self._prefix_hash:
+                logger.warning("⚠️ System prompt prefix changed mid-run; prompt cache will miss")
+            self._prefix_hash = prefix_hash
+        return {"extra_body": {"prompt_cache_key": prefix_hash}}
+    
+    def _request_completion(self, messages: List[Dict[str, Any]]) -> str:
+        """Request a completion and return the response text.
+        
+        When streaming is enabled, tokens are accumulated as they arrive and
+        generation is cancelled as soon as the action block has closed, so the
+        action can be executed without waiting for the trailing reasoning.
+        
+        Args:
+            messages: Messages to send to the chat completions API
             
-        except Exception as e:
-            print(f"❌ Error in plan_action: {e}")
-            import traceback
-            traceback.print_exc()
-            return AndroidAction(action=AndroidActionType.FAILURE)
+        Returns:
+            The (possibly truncated) response text
+        """
+        cache_kwargs = self._prompt_cache_kwargs(messages, track=True)
+        if not self.options.stream:
+            response = self.client.chat.completions.create(
+                model=self.options.model,
+                messages=messages,
+                temperature=self.options.temperature,
+                max_tokens=self.options.max_tokens,
+                **cache_kwargs
+            )
+            return response.choices[0].message.content
+        
+        stream = self.client.chat.completions.create(
+            model=self.options.model,
+            messages=messages,
+            temperature=self.options.temperature,
+            max_tokens=self.options.max_tokens,
+            stream=True,
+            **cache_kwargs
+        )
+        buffer = ""
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                buffer += delta
+                if _SECTION_RE["action"].search(buffer):
+                    # Action block is complete - stop generating the rest
+                    break
+        finally:
+            stream.close()
+        return buffer
+    
+    def _request_tool_actions(
+        self, messages: List[Dict[str, Any]], current_state: AndroidState, parallel: bool = True
+    ) -> List[AndroidAction]:
+        """Request actions as tool calls and parse every call in the response.
+        
+        Args:
+            messages: Messages to send to the chat completions API
+            current_state: Device state the actions are planned for
+            parallel: Whether the model may return several tool calls at once
             
+        Returns:
+            The planned actions in call order; at least one
+        """
+        response = self.client.chat.completions.create(
+            model=self.options.model,
+            messages=messages,
+            temperature=self.options.temperature,
+            max_tokens=self.options.max_tokens,
+            tools=[ACTION_TOOL],
+            parallel_tool_calls=parallel,
+            **self._prompt_cache_kwargs(messages, track=True)
+        )
+        message = response.choices[0].message
+        response_text = message.content or ""
+        if not message.tool_calls:
+            # No tool call - fall back to parsing the text
+            return [self._handle_response(response_text, current_state)]
+        
+        self._record_observation(response_text, current_state)
+        actions = []
+        for call in message.tool_calls:
+            try:
+                action_json = json.loads(call.function.arguments)
+            except json.JSONDecodeError as e:
+                logger.warning("⚠️ Invalid tool call arguments %r: %s", call.function.arguments, e)
+                continue
+            action = self._action_from_json(action_json, response_text)
+            logger.info("🎯 Selected action: %s", action.action)
+            actions.append(action)
+        return actions or [self._infer_action_from_text(response_text)]
+    
     def _extract_section(self, text: str, section_name: str) -> Optional[str]:
         """Extract a specific section from the response.
         
@@ -808,8 +1424,10 @@ Your response must be formatted as follows:
         Returns:
             The extracted section text or None if not found
         """
-        pattern = rf"```{section_name}\n(.*?)```"
-        match = re.search(pattern, text, re.DOTALL)
+        pattern = _SECTION_RE.get(section_name)
+        if pattern is None:
+            pattern = re.compile(rf"```{section_name}\n(.*?)```", re.DOTALL)
+        match = pattern.search(text)
         if match:
             return match.group(1).strip()
         return None 
\ No newline at end of file
@@ -2,14 +2,45 @@
 
 Tracks the state of Android automation to help prevent loops and errors.
 """
+import logging
+from collections import Counter
 from typing import Optional, Tuple, List, Dict, Union
 from .android_action import AndroidActionType, Coordinate
 
+logger = logging.getLogger(__name__)
+
+
+def _norm(coordinate: Union[Tuple[float, float], 'Coordinate']) -> Tuple[int, int]:
+    """Normalize a coordinate to a hashable tuple of ints on the 0-1000 grid.
+    
+    Args:
+        coordinate: Normalized (0-1) or 0-1000 coordinate, as tuple or Coordinate
+        
+    Returns:
+        Tuple of integer (x, y) values suitable for fast equality checks
+    """
+    x = getattr(coordinate, 'x', None)
+    y = getattr(coordinate, 'y', None)
+    if x is None or y is None:
+        x, y = coordinate[0], coordinate[1]
+    # Normalized coordinates are scaled up so both forms compare consistently
+    if x <= 1 and y <= 1:
+        return int(x * 1000), int(y * 1000)
+    return int(x), int(y)
+
+
 class AndroidStateTracker:
+    # Generic input-field bands as (top, bottom, left, right, label) in normalized units
+    _INPUT_BANDS = (
+        (0.05, 0.2, 0.05, 0.95, "Likely URL/address bar"),
+        (0.15, 0.85, 0.05, 0.95, "Possible form field"),
+        (0.75, 0.95, 0.05, 0.8, "Likely bottom text input area"),
+    )
+    
     def __init__(self):
         self.last_tap_position = None
         self.last_action = None
-        self.action_count = {}
+        self.action_count = Counter()
         self.max_attempts = 10  # Increased from 5 to 10 for more tolerance
         self.must_type_next = False
         self.last_screen_state = None
@@ -60,25 +91,23 @@ class AndroidStateTracker:
             bool: Whether the action should be allowed
         """
         # Update action count
-        if action not in self.action_count:
-            self.action_count[action] = 0
         self.action_count[action] += 1
         
         # Handle TYPE action specially - we want to be more permissive
         if action == AndroidActionType.TYPE:
             # If keyboard is visible or we recently tapped an input field, always allow typing
             if self.keyboard_visible or self.input_box_tapped or self.last_tap_was_input:
-                print("⌨️ Type action allowed - keyboard visible or input field tapped")
+                logger.debug("⌨️ Type action allowed - keyboard visible or input field tapped")
                 self.typing_attempted = True
                 return True
                 
             # If a type action was recently blocked, try again but warn
             if self.typing_attempted:
-                print("⚠️ Multiple type attempts without keyboard, but allowing anyway")
+                logger.debug("⚠️ Multiple type attempts without keyboard, but allowing anyway")
                 return True
                 
             # First time trying to type without visible keyboard
-            print("⚠️ Type action requested but no input field tapped first")
+            logger.debug("⚠️ Type action requested but no input field tapped first")
             self.typing_attempted = True
             # Be permissive and allow it anyway
             return True
@@ -89,18 +118,19 @@ class AndroidStateTracker:
             
         # Special handling for exact same tap location to avoid being stuck clicking the same spot
         if action == AndroidActionType.TAP and coordinate:
-            if self.last_tap_coords == coordinate:
+            tap_coords = _norm(coordinate)
+            if self.last_tap_coords == tap_coords:
                 self.consecutive_same_tap_count += 1
                 # Allow more repeated taps before blocking
                 if self.consecutive_same_tap_count > 5:  # Increased from 3 to 5
-                    print(f"⚠️ Detected exactly same tap position {self.consecutive_same_tap_count} times")
+                    logger.warning("⚠️ Detected exactly same tap position %s times", self.consecutive_same_tap_count)
                     # Allow more attempts before blocking
                     if self.consecutive_same_tap_count > 8:  # Increased from 5 to 8
-                        print("❌ Too many identical taps, trying to break out of loop")
+                        logger.warning("❌ Too many identical taps, trying to break out of loop")
                         return False
             else:
                 self.consecutive_same_tap_count = 0
-                self.last_tap_coords = coordinate
+                self.last_tap_coords = tap_coords
         
         # Be more lenient with checking for redundant actions
         if action == self.last_action:
@@ -109,9 +139,9 @@ class AndroidStateTracker:
                 self.action_count[action] = 0
                 # Only block for tap actions that seem stuck
                 if action == AndroidActionType.TAP and self.consecutive_same_tap_count > 5:
-                    print(f"⚠️ Excessive same-location taps detected. Blocking to avoid loop.")
+                    logger.warning("⚠️ Excessive same-location taps detected. Blocking to avoid loop.")
                     return False
-                print(f"⚠️ Many repeated {action} actions, but allowing to continue")
+                logger.warning("⚠️ Many repeated %s actions, but allowing to continue", action)
         
         # Special handling for input box taps - improved detection
         if action == AndroidActionType.TAP and coordinate:
@@ -120,14 +150,14 @@ class AndroidStateTracker:
             self.last_tap_was_input = is_input
             
             if is_input:
-                print(f"🖋️ Detected tap on input field at {coordinate}")
+                logger.debug("🖋️ Detected tap on input field at %s", coordinate)
                 self.input_box_tapped = True
                 self.must_type_next = True
                 
                 # Set flag for keyboard checks
                 self.keyboard_visible = True  # Optimistically set true, will be verified later
             else:
-                print(f"👆 Tapped non-input area at {coordinate}")
+                logger.debug("👆 Tapped non-input area at %s", coordinate)
                 # Don't immediately reset these flags - keep them for one more action
                 # This allows for slight mistakes in input detection
         elif action == AndroidActionType.TYPE:
@@ -163,9 +193,9 @@ class AndroidStateTracker:
             x, y = coordinate[0], coordinate[1]
         
         # Normalize coordinates if needed
-        if isinstance(x, (int, float)) and x > 1:
+        if x > 1:
             x /= 1000.0  # Normalize to 0-1 range if needed
-        if isinstance(y, (int, float)) and y > 1:
+        if y > 1:
             y /= 1000.0  # Normalize to 0-1 range if needed
         
         # Check if in app icon region (bottom of screen)
@@ -179,26 +209,14 @@ class AndroidStateTracker:
             for region in regions:
                 left, top, right, bottom = region
                 if left <= x <= right and top <= y <= bottom:
-                    print(f"📝 Found input region match for {app_name}")
+                    logger.debug("📝 Found input region match for %s", app_name)
                     return True
                 
-        # More generous input detection
-        # 1. Address/URL bars - near top of screen
-        if 0.05 <= y <= 0.2:
-            if 0.05 <= x <= 0.95:  # Centered horizontally, wider range
-                print("📝 Likely URL/address bar detected")
-                return True
-                
-        # 2. Search boxes and form fields - middle of screen
-        if 0.15 <= y <= 0.85:  # Expanded middle section even more
-            if 0.05 <= x <= 0.95:  # Centered horizontally, wider range
-                print("📝 Possible form field detected")
-                return True
-        
-        # 3. Bottom text input areas (common in chat apps)
-        if 0.75 <= y <= 0.95:
-            if 0.05 <= x <= 0.8:  # Left side of bottom (typical text input)
-                print("📝 Likely bottom text input area detected")
+        # More generous input detection: URL bars near the top, form fields in
+        # the middle, and bottom-left chat inputs (see _INPUT_BANDS)
+        for top, bottom, left, right, label in self._INPUT_BANDS:
+            if top <= y <= bottom and left <= x <= right:
+                logger.debug("📝 %s detected", label)
                 return True
         
         # Default to not an input box
@@ -230,7 +248,7 @@ class AndroidStateTracker:
             visible: Whether keyboard is visible
         """
         self.keyboard_visible = visible
-        print(f"⌨️ Keyboard visibility set to: {visible}")
+        logger.debug("⌨️ Keyboard visibility set to: %s", visible)
         
         # If keyboard becomes visible, this confirms we're in an input field
         if visible:
@@ -242,7 +260,7 @@ class AndroidStateTracker:
         """Reset the state tracker"""
         self.last_tap_position = None
         self.last_action = None
-        self.action_count = {}
+        self.action_count = Counter()
         self.must_type_next = False
         self.last_screen_state = None
         self.input_box_tapped = False
@@ -0,0 +1,12 @@
+"""Put the src directory on the Python path so the examples can import android_agent.
+
+Import this before any android_agent or examples imports.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
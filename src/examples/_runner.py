@@ -0,0 +1,277 @@
+"""Shared runner for the agent-driven example scripts.
+
+Holds the argument parsing, planner and agent setup, keyboard check and
+cleanup that the examples have in common, so each example only supplies
+its goal, instructions and any app-specific preparation.
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence
+
+from . import _bootstrap  # noqa: F401
+
+if TYPE_CHECKING:
+    from android_agent.adb_session import AdbSession
+
+logger = logging.getLogger("android_agent.examples")
+
+# Local port minicap is forwarded to; concurrent per-device runs each take
+# the next port up so no two devices share a forward
+_MINICAP_BASE_PORT = 1313
+_MINICAP_PORT_ENV = "ANDROID_AGENT_MINICAP_PORT"
+
+
+def get_api_key(api_key: Optional[str] = None) -> Optional[str]:
+    """Get OpenAI API key from args or environment.
+
+    Args:
+        api_key: API key from command line
+
+    Returns:
+        API key if found, None otherwise
+    """
+    return api_key or os.environ.get("OPENAI_API_KEY")
+
+
+def _strip_serials_arg(argv: List[str]) -> List[str]:
+    """Remove --serials and its value from an argument list.
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        The arguments without --serials
+    """
+    stripped = []
+    skip_next = False
+    for arg in argv:
+        if skip_next:
+            skip_next = False
+        elif arg == "--serials":
+            skip_next = True
+        elif not arg.startswith("--serials="):
+            stripped.append(arg)
+    return stripped
+
+
+def run_on_serials(serials: List[str]) -> int:
+    """Run this example once per device, all devices at the same time.
+
+    Each device gets its own child process with ANDROID_SERIAL set, so every
+    adb call in that process targets that device, and its own minicap port.
+
+    Args:
+        serials: Device serials to run on
+
+    Returns:
+        The highest exit code of the per-device runs
+    """
+    argv = [sys.executable, sys.argv[0]] + _strip_serials_arg(sys.argv[1:])
+
+    def run_one(index: int, serial: str) -> int:
+        print(f"📱 Starting run on {serial}")
+        env = dict(os.environ, ANDROID_SERIAL=serial)
+        env[_MINICAP_PORT_ENV] = str(_MINICAP_BASE_PORT + index)
+        returncode = subprocess.run(argv, env=env).returncode
+        print(f"📱 Run on {serial} finished with exit code {returncode}")
+        return returncode
+
+    with ThreadPoolExecutor(max_workers=len(serials)) as pool:
+        return max(pool.map(run_one, range(len(serials)), serials))
+
+
+def run(
+    description: str,
+    title: str,
+    task: str,
+    goal: Callable[[argparse.Namespace], str],
+    context: Callable[[argparse.Namespace], str],
+    instructions: Sequence[str],
+    screenshot_subdir: str,
+    max_steps: int = 50,
+    extra_args: Optional[Callable[[argparse.ArgumentParser], None]] = None,
+    summary: Optional[Callable[[argparse.Namespace], str]] = None,
+    prepare: Optional[Callable[[argparse.Namespace, "AdbSession"], Optional[Callable[[], None]]]] = None
+) -> int:
+    """Parse arguments, run the agent towards a goal and clean up.
+
+    Args:
+        description: Description shown in --help
+        title: Banner title printed before the run starts
+        task: Short task name used in the final status messages
+        goal: Builds the agent goal from the parsed arguments
+        context: Builds the additional context from the parsed arguments
+        instructions: Additional instructions for the planner
+        screenshot_subdir: Directory under screenshots/ for this example
+        max_steps: Maximum number of agent steps
+        extra_args: Adds example-specific arguments to the parser
+        summary: Builds an extra banner line from the parsed arguments
+        prepare: Called once the ADB session is open; may return a callable
+            that runs just before the agent starts
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--adb_path", required=True, help="Path to ADB executable")
+    parser.add_argument("--api_key", help="OpenAI API key (can also use OPENAI_API_KEY env var)")
+    if extra_args:
+        extra_args(parser)
+    parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument("--pause", action="store_true", help="Pause after each action")
+    parser.add_argument("--keyboard_check", action="store_true",
+                      help="Verify keyboard appearance before starting")
+    parser.add_argument("--minicap_dir",
+                      help="Directory with minicap and minicap.so for fast screenshots")
+    parser.add_argument("--serials",
+                      help="Comma-separated device serials to run on concurrently")
+    args = parser.parse_args()
+
+    if args.serials:
+        serials = [s.strip() for s in args.serials.split(",") if s.strip()]
+        if serials:
+            return run_on_serials(serials)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, format="%(message)s")
+
+    # Get API key
+    api_key = get_api_key(args.api_key)
+    if not api_key:
+        print("Error: OpenAI API key required (via --api_key or OPENAI_API_KEY env var)")
+        return 1
+
+    # Imported here so --help and argument errors don't pay for loading the agent
+    from android_agent.android_agent import AndroidAgent, AndroidAgentOptions, AndroidGoalState
+    from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
+    from android_agent.android_controller import (
+        ensure_keyboard_hidden,
+        cleanup_and_dismiss,
+        start_minicap
+    )
+    from android_agent.adb_session import AdbSession
+
+    screenshot_dir = f"screenshots/{screenshot_subdir}"
+    serial = os.environ.get("ANDROID_SERIAL")
+    if serial:
+        screenshot_dir = f"{screenshot_dir}/{serial}"
+
+    # Configure OpenAI planner
+    planner_options = OpenAIPlannerOptions(
+        api_key=api_key,
+        model="gpt-4o",
+        temperature=0.2,
+        debug=args.debug,
+        cache_by_structure=True
+    )
+
+    # Build the planner (client setup loads the TLS trust store) while the
+    # screenshots directory is created
+    with ThreadPoolExecutor(2) as pool:
+        planner_future = pool.submit(OpenAIPlanner, options=planner_options)
+        dir_future = pool.submit(os.makedirs, screenshot_dir, exist_ok=True)
+        planner = planner_future.result()
+        dir_future.result()
+
+    # Warm up the planner's connection while setup continues
+    planner.warmup()
+
+    screenshot_dir_fd = None
+    if os.open in os.supports_dir_fd:
+        screenshot_dir_fd = os.open(
+            screenshot_dir, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+        )
+
+    # One persistent adb shell for key presses and keyboard checks
+    session = AdbSession(args.adb_path)
+    before_start = prepare(args, session) if prepare else None
+
+    # Stream screenshots through minicap when its binaries are provided
+    minicap_port = int(os.environ.get(_MINICAP_PORT_ENV, _MINICAP_BASE_PORT))
+    minicap_proc = (
+        start_minicap(args.adb_path, args.minicap_dir, port=minicap_port) if args.minicap_dir else None
+    )
+
+    agent_options = AndroidAgentOptions(
+        additional_context=context(args),
+        additional_instructions=list(instructions),
+        max_steps=max_steps,
+        pause_after_each_action=args.pause,
+        screenshot_dir=screenshot_dir,
+        adb_session=session,
+        parallel_probes=True,
+        use_minicap=minicap_proc is not None,
+        minicap_port=minicap_port,
+        track_ui_structure=True,
+        fast_input=True,
+        screenshot_max_dim=768,
+        screenshot_format="jpeg",
+        screenshot_dir_fd=screenshot_dir_fd
+    )
+
+    agent = AndroidAgent(
+        adb_path=args.adb_path,
+        action_planner=planner,
+        goal=goal(args),
+        options=agent_options
+    )
+
+    try:
+        # Before starting, check keyboard state if requested
+        if args.keyboard_check:
+            print("\n--- Pre-test keyboard check ---")
+            ensure_keyboard_hidden(args.adb_path, session=session)
+
+        # Start the automation
+        print(f"\n========== Starting {title} ==========")
+        if summary:
+            print(summary(args))
+        print(f"Model: {planner_options.model}")
+        print(f"Max steps: {agent_options.max_steps}")
+        print(f"Screenshots: {screenshot_dir}")
+        if args.debug:
+            print("Debug mode enabled")
+        print("\nPress Ctrl+C to abort\n")
+
+        if before_start:
+            before_start()
+
+        agent.start()
+
+        # Check final status
+        if agent.status == AndroidGoalState.SUCCESS:
+            print(f"\n✅ Successfully completed {task}!")
+            return 0
+        elif agent.status == AndroidGoalState.FAILED:
+            print(f"\n❌ Failed to complete {task}. Final status: {agent.status}")
+            return 1
+        else:
+            print(f"\n⚠️ {task[0].upper() + task[1:]} not completed (reached maximum steps)")
+            return 1
+
+    except KeyboardInterrupt:
+        print("\nOperation aborted by user")
+        return 130
+
+    except Exception as e:
+        # The traceback is only formatted when --debug is on
+        logger.error("\nError during automation: %s", e, exc_info=args.debug)
+        return 1
+
+    finally:
+        # Cleanup
+        try:
+            print("\nPerforming cleanup...")
+            # Go back to home screen and dismiss the keyboard in one shell call
+            cleanup_and_dismiss(args.adb_path, session=session)
+        except Exception as e:
+            logger.debug("Cleanup error: %s", e)
+        session.close()
+        if minicap_proc:
+            minicap_proc.terminate()
+        if screenshot_dir_fd is not None:
+            os.close(screenshot_dir_fd)
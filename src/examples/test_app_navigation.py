@@ -9,17 +9,47 @@ This script shows how to:
 """
 
 import argparse
+import logging
 import os
+import re
 import sys
 import time
 from typing import List, Optional
 
-# Add the parent directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import _bootstrap  # noqa: F401
 
-from android_agent.android_agent import AndroidAgent, AndroidAgentOptions
-from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
-from android_agent.android_controller import tap_app_by_index, press_home, press_back
+
+_LAUNCHER_RE = re.compile(r"launcher", re.IGNORECASE)
+
+INSTRUCTIONS = (
+    "Be precise with tap coordinates",
+    "Look for app drawer or apps list button",
+    "Wait for apps to fully open before closing",
+    "Make sure to identify different apps to test",
+    "If an app doesn't open, try a different one",
+    "Record the names of apps that are visible",
+    "Look for system and third-party apps",
+    "Use grid-based calculations for app positions",
+    "Calendar app is typically at index 0 in the app grid",
+    "Avoid tapping in the top search bar area",
+    "Allow extra time after swipe_up for app drawer to settle",
+    "Verify current app after each tap"
+)
+
+GOAL_TEMPLATE = """Test app navigation by:
+        1. Going to home screen
+        2. Opening the app list/drawer
+        3. Making note of visible apps
+        4. Opening and closing {num_apps} different apps sequentially
+        
+        Be sure to:
+        - Press HOME to reach home screen
+        - Look for app drawer or swipe up gesture
+        - Record names of visible apps
+        - Select {num_apps} different apps to test
+        - Open each app completely
+        - Close each app with BACK button
+        - Verify each app opens and closes correctly"""
 
 
 def get_api_key(api_key: Optional[str] = None) -> Optional[str]:
@@ -36,12 +66,18 @@ def main():
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, format="%(message)s")
+
     # Get API key
     api_key = get_api_key(args.api_key)
     if not api_key:
         print("Error: OpenAI API key required (via --api_key or OPENAI_API_KEY env var)")
         return 1
 
+    # Imported here so --help and argument errors don't pay for loading the agent
+    from android_agent.android_agent import AndroidAgent, AndroidAgentOptions
+    from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
+
     # Create screenshots directory
     screenshot_dir = "screenshots/app_navigation_test"
     os.makedirs(screenshot_dir, exist_ok=True)
@@ -58,20 +94,7 @@ def main():
     # Configure agent options with updated instructions
     agent_options = AndroidAgentOptions(
         additional_context="Testing app navigation with improved grid-based tapping",
-        additional_instructions=[
-            "Be precise with tap coordinates",
-            "Look for app drawer or apps list button",
-            "Wait for apps to fully open before closing",
-            "Make sure to identify different apps to test",
-            "If an app doesn't open, try a different one",
-            "Record the names of apps that are visible",
-            "Look for system and third-party apps",
-            "Use grid-based calculations for app positions",
-            "Calendar app is typically at index 0 in the app grid",
-            "Avoid tapping in the top search bar area",
-            "Allow extra time after swipe_up for app drawer to settle",
-            "Verify current app after each tap"
-        ],
+        additional_instructions=list(INSTRUCTIONS),
         max_steps=50,
         screenshot_dir=screenshot_dir
     )
@@ -80,20 +103,7 @@ def main():
     agent = AndroidAgent(
         adb_path=args.adb_path,
         action_planner=planner,
-        goal=f"""Test app navigation by:
-        1. Going to home screen
-        2. Opening the app list/drawer
-        3. Making note of visible apps
-        4. Opening and closing {args.num_apps} different apps sequentially
-        
-        Be sure to:
-        - Press HOME to reach home screen
-        - Look for app drawer or swipe up gesture
-        - Record names of visible apps
-        - Select {args.num_apps} different apps to test
-        - Open each app completely
-        - Close each app with BACK button
-        - Verify each app opens and closes correctly""",
+        goal=GOAL_TEMPLATE.format(num_apps=args.num_apps),
         options=agent_options
     )
 
@@ -110,11 +120,13 @@ def main():
         print(f"Status: {agent.status}")
         
         # List all apps that were opened
+        seen = set()
         apps_opened = []
         for step in agent.history:
-            if step.state and step.state.current_app:
-                if step.state.current_app not in apps_opened and "launcher" not in step.state.current_app.lower():
-                    apps_opened.append(step.state.current_app)
+            app = step.state.current_app if step.state else None
+            if app and app not in seen and not _LAUNCHER_RE.search(app):
+                seen.add(app)
+                apps_opened.append(app)
         
         if apps_opened:
             print("\nApps tested:")
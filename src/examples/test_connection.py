@@ -13,11 +13,10 @@ import os
 import sys
 import time
 
-# Add src directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import _bootstrap  # noqa: F401
 
 from android_agent.android_controller import (
-    get_device_size, 
+    get_device_size_cached, 
     take_screenshot, 
     is_keyboard_visible, 
     dismiss_keyboard,
@@ -44,14 +43,16 @@ def main():
     args = parse_args()
     
     # Check if ADB executable exists
-    if not os.path.exists(args.adb_path):
+    try:
+        os.stat(args.adb_path)
+    except FileNotFoundError:
         print(f"Error: ADB executable not found at '{args.adb_path}'")
         return 1
     
     try:
         # Test getting device size
         print("Testing ADB connection and getting device size...")
-        width, height = get_device_size(args.adb_path)
+        width, height = get_device_size_cached(args.adb_path)
         print(f"Device screen size: {width}x{height}")
         
         # Check current app
@@ -84,7 +85,13 @@ def main():
         print(f"\nTaking a screenshot and saving to {args.output}...")
         take_screenshot(args.adb_path, args.output)
         
-        if os.path.exists(args.output):
+        # One stat that also catches an empty file
+        try:
+            ok = os.path.getsize(args.output) > 0
+        except OSError:
+            ok = False
+        
+        if ok:
             print(f"Success! Screenshot saved to {args.output}")
             return 0
         else:
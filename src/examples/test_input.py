@@ -10,18 +10,13 @@ This script demonstrates the improved keyboard handling features:
 """
 
 import argparse
+import logging
 import os
 import sys
 import time
 from typing import List, Optional
 
-# Add the parent directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from android_agent.android_agent import AndroidAgent, AndroidAgentOptions, AndroidGoalState
-from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
-from android_agent.android_controller import is_keyboard_visible, wait_for_keyboard, dismiss_keyboard
-from android_agent.android_action import AndroidAction, AndroidActionType
+import _bootstrap  # noqa: F401
 
 
 def get_api_key(api_key: Optional[str] = None) -> Optional[str]:
@@ -48,12 +43,20 @@ def main():
     parser.add_argument("--pause", action="store_true", help="Pause after each action")
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, format="%(message)s")
+
     # Get API key
     api_key = get_api_key(args.api_key)
     if not api_key:
         print("Error: OpenAI API key required (via --api_key or OPENAI_API_KEY env var)")
         return 1
 
+    # Imported here so --help and argument errors don't pay for loading the agent
+    from android_agent.android_agent import AndroidAgent, AndroidAgentOptions, AndroidGoalState
+    from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
+    from android_agent.android_controller import ensure_keyboard_hidden
+    from android_agent.android_action import AndroidAction, AndroidActionType
+
     # Configure OpenAI planner
     planner_options = OpenAIPlannerOptions(
         api_key=api_key,
@@ -112,15 +115,7 @@ def main():
     try:
         # Before starting, check keyboard state and dismiss if visible
         print("\n--- Pre-test keyboard check ---")
-        keyboard_visible = False
-        try:
-            keyboard_visible = is_keyboard_visible(args.adb_path)
-            print(f"Keyboard visible before test: {keyboard_visible}")
-            if keyboard_visible:
-                print("Dismissing keyboard before starting...")
-                dismiss_keyboard(args.adb_path)
-        except Exception as e:
-            print(f"Error checking keyboard state: {e}")
+        ensure_keyboard_hidden(args.adb_path)
 
         # Start the automation
         print("\n--- Starting keyboard input test ---")
@@ -134,14 +129,7 @@ def main():
         
         # Check keyboard state after completion
         print("\n--- Post-test keyboard check ---")
-        try:
-            keyboard_visible = is_keyboard_visible(args.adb_path)
-            print(f"Keyboard visible after test: {keyboard_visible}")
-            if keyboard_visible:
-                print("Dismissing keyboard...")
-                dismiss_keyboard(args.adb_path)
-        except Exception as e:
-            print(f"Error checking keyboard state: {e}")
+        ensure_keyboard_hidden(args.adb_path)
         
         # Check final status
         if agent.status == AndroidGoalState.SUCCESS:
@@ -172,9 +160,7 @@ def main():
             # Try to go back to home screen
             agent._take_action(AndroidAction(action=AndroidActionType.PRESS, key=3))
             # Check if keyboard is visible and dismiss it
-            if is_keyboard_visible(args.adb_path):
-                print("Dismissing keyboard...")
-                dismiss_keyboard(args.adb_path)
+            ensure_keyboard_hidden(args.adb_path)
         except Exception as e:
             if args.debug:
                 print(f"Cleanup error: {e}")
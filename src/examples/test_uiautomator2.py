@@ -9,13 +9,13 @@ This script shows how to:
 """
 
 import argparse
+import importlib.util
+import logging
 import os
 import sys
-import time
 from typing import List, Optional
 
-# Add the parent directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import _bootstrap  # noqa: F401
 
 from android_agent.android_agent import AndroidAgent, AndroidAgentOptions, AndroidGoalState
 from android_agent.android_action import AndroidAction, AndroidActionType
@@ -41,17 +41,17 @@ def get_api_key(api_key: Optional[str] = None) -> Optional[str]:
     return api_key or os.environ.get("OPENAI_API_KEY")
 
 
+# Looked up once at import; find_spec walks sys.path on every call
+_HAS_UIAUTOMATOR2 = importlib.util.find_spec("uiautomator2") is not None
+
+
 def check_uiautomator2() -> bool:
     """Check if UIAutomator2 is installed.
     
     Returns:
         bool: Whether UIAutomator2 is available
     """
-    try:
-        import importlib.util
-        return importlib.util.find_spec("uiautomator2") is not None
-    except Exception:
-        return False
+    return _HAS_UIAUTOMATOR2
 
 
 def test_direct_input(adb_path: str, app_package: str, x: float, y: float, text: str) -> bool:
@@ -71,11 +71,11 @@ def test_direct_input(adb_path: str, app_package: str, x: float, y: float, text:
         print("\n=== Testing Direct UIAutomator2 Input ===")
         
         # Launch app
-        from android_agent.android_controller import launch_app, press_home
+        from android_agent.android_controller import launch_app, press_home, wait_for_app, wait_for_activity
         press_home(adb_path)
-        time.sleep(1)
+        wait_for_app(adb_path, "Launcher", timeout=2.0)
         launch_app(adb_path, app_package)
-        time.sleep(2)
+        wait_for_activity(adb_path, app_package, timeout=5.0)
         
         # Try to input text using UIAutomator2
         print(f"📝 Attempting to input text to field at ({x}, {y})")
@@ -105,6 +105,8 @@ def main():
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, format="%(message)s")
+
     # Check if UIAutomator2 is installed
     if not check_uiautomator2():
         print("\n❌ UIAutomator2 is not installed. Please install it with:")
@@ -6,27 +6,83 @@ using the Android Agent with improved state management and error handling.
 """
 
 import argparse
+import contextlib
+import functools
+import io
+import json
+import logging
 import os
+import re
+import socket
+import stat
 import sys
+import tempfile
+import threading
 import time
 import subprocess
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from android_agent.android_agent import AndroidAgent, AndroidAgentOptions, AndroidGoalState
-from android_agent.android_action import AndroidAction, AndroidActionType
-from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
-from android_agent.android_controller import (
-    is_keyboard_visible, 
-    dismiss_keyboard,
-    get_current_app,
-    press_home,
-    press_back
-)
+# The android_agent package pulls in the OpenAI/HTTP stack, so it is imported
+# where it is used; --help and argument or validation errors don't pay for it
+if TYPE_CHECKING:
+    from android_agent.adb_session import AdbClient
+    from android_agent.android_agent import AndroidAgent
+    from android_agent.openai_planner import OpenAIPlanner
+
+# Client for the local adb server, set by validate_environment when the server
+# is reachable; keyboard checks and cleanup go through it instead of the adb CLI
+_ADB_CLIENT: Optional["AdbClient"] = None
+
+# Successful environment checks are remembered here for _VALIDATION_TTL seconds
+_VALIDATION_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "android_agent", "validate_environment.json")
+_VALIDATION_TTL = 60.0
+
+
+def _cached_validation(func):
+    """Skip a repeated environment check for the same adb binary and device within the TTL.
+    
+    Entries are keyed by the adb path, its modification time and $ANDROID_SERIAL.
+    Only successful checks are cached.
+    """
+    @functools.wraps(func)
+    def wrapper(adb_path: str) -> bool:
+        global _ADB_CLIENT
+        try:
+            key = f"{os.path.abspath(adb_path)}:{os.path.getmtime(adb_path)}:{os.environ.get('ANDROID_SERIAL', '')}"
+        except OSError:
+            return func(adb_path)
+        
+        try:
+            with open(_VALIDATION_CACHE) as f:
+                entry = json.load(f).get(key)
+        except (OSError, ValueError, AttributeError):
+            entry = None
+        if entry and time.time() - entry.get("ts", 0) < _VALIDATION_TTL:
+            if entry.get("client"):
+                from android_agent.adb_session import AdbClient
+                _ADB_CLIENT = AdbClient()
+            return True
+        
+        ok = func(adb_path)
+        if ok:
+            try:
+                os.makedirs(os.path.dirname(_VALIDATION_CACHE), exist_ok=True)
+                tmp_path = f"{_VALIDATION_CACHE}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({key: {"ts": time.time(), "client": _ADB_CLIENT is not None}}, f)
+                os.replace(tmp_path, _VALIDATION_CACHE)
+            except OSError:
+                pass
+        return ok
+    
+    return wrapper
 
 
+@_cached_validation
 def validate_environment(adb_path: str) -> bool:
     """Validate the execution environment.
     
@@ -36,22 +92,47 @@ def validate_environment(adb_path: str) -> bool:
     Returns:
         True if environment is valid, False otherwise
     """
-    # Check ADB exists
-    if not os.path.exists(adb_path):
+    # Check ADB exists and is executable with a single stat
+    try:
+        mode = os.stat(adb_path).st_mode
+    except OSError:
         print(f"Error: ADB executable not found at '{adb_path}'")
         return False
-        
-    # Check ADB is executable
-    if not os.access(adb_path, os.X_OK):
+    if not mode & 0o111:
         print(f"Error: ADB executable at '{adb_path}' is not executable")
         return False
         
-    # Check device connection
+    # Check device connection through the adb server socket; if the server
+    # isn't running, start it now so neither this check nor the agent's
+    # first command pays for the daemon start, then try the socket again
+    from android_agent.adb_session import AdbClient
+    global _ADB_CLIENT
+    for attempt in range(2):
+        try:
+            client = AdbClient()
+            devices = client.devices()
+            if not any(state == "device" for _, state in devices):
+                print("Error: No Android device connected")
+                print(f"ADB devices: {devices}")
+                return False
+            _ADB_CLIENT = client
+            return True
+        except (OSError, RuntimeError, ValueError):
+            if attempt:
+                break
+            try:
+                subprocess.run([adb_path, "start-server"], capture_output=True, timeout=5)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                print(f"⚠️ Could not start the ADB server: {e}")
+                break
+    
+    # Server unreachable over the socket (e.g. a non-default port) - use the CLI
     try:
-        result = subprocess.run([adb_path, "devices"], capture_output=True, text=True)
-        if "device" not in result.stdout and "emulator" not in result.stdout:
+        if not _adb_devices_ok(adb_path):
+            # Don't keep the failure; a device may be connected before the next check
+            _adb_devices_ok.cache_clear()
             print("Error: No Android device connected")
-            print(f"ADB output: {result.stdout}")
+            print(f"Run '{adb_path} devices' to see the connected devices and their states")
             return False
     except Exception as e:
         print(f"Error checking device connection: {e}")
@@ -60,6 +141,20 @@ def validate_environment(adb_path: str) -> bool:
     return True
 
 
+@functools.lru_cache(maxsize=4)
+def _adb_devices_ok(adb_path: str) -> bool:
+    """Whether `adb devices` lists at least one device ready for commands.
+    
+    Args:
+        adb_path: Path to ADB executable
+        
+    Returns:
+        bool: Whether a device is in the "device" state
+    """
+    output = subprocess.run([adb_path, "devices"], capture_output=True).stdout
+    return b"\tdevice" in output
+
+
 def get_api_key(api_key: Optional[str] = None) -> Optional[str]:
     """Get OpenAI API key from args or environment.
     
@@ -72,17 +167,106 @@ def get_api_key(api_key: Optional[str] = None) -> Optional[str]:
     return api_key or os.environ.get("OPENAI_API_KEY")
 
 
-def parse_args():
-    """Parse command line arguments."""
+# Flags understood by _fast_parse_args: flag -> (dest, kind, default).
+# Keep in sync with the argparse definitions in parse_args.
+_FAST_FLAGS = {
+    "--adb_path": ("adb_path", str, None),
+    "--goal": ("goal", str, None),
+    "--goals_file": ("goals_file", str, None),
+    "--api_key": ("api_key", str, None),
+    "--model": ("model", str, "gpt-4o"),
+    "--max_steps": ("max_steps", int, 50),
+    "--pause": ("pause", bool, False),
+    "--screenshots": ("screenshots", str, "screenshots"),
+    "--screenshot_max": ("screenshot_max", int, 768),
+    "--screenshot_quality": ("screenshot_quality", int, 80),
+    "--context": ("context", str, None),
+    "--instruction": ("instructions", list, None),
+    "--debug": ("debug", bool, False),
+    "--keyboard_check": ("keyboard_check", bool, False),
+    "--example": ("example", str, None),
+    "--skip_chrome_setup": ("skip_chrome_setup", bool, False),
+    "--pipeline": ("pipeline", bool, False),
+    "--use_tools": ("use_tools", bool, False),
+    "--daemon": ("daemon", bool, False),
+    "--serve_daemon": ("serve_daemon", bool, False),
+}
+
+
+def _fast_parse_args(argv: List[str]) -> Optional[argparse.Namespace]:
+    """Parse well-formed command lines without building the argparse parser.
+    
+    Args:
+        argv: Arguments to parse
+        
+    Returns:
+        Parsed arguments, or None if argparse should handle the command line
+        (help, unknown flags, missing or invalid values)
+    """
+    values = {dest: ([] if kind is list else default) for dest, kind, default in _FAST_FLAGS.values()}
+    i = 0
+    while i < len(argv):
+        flag, sep, value = argv[i].partition("=")
+        spec = _FAST_FLAGS.get(flag)
+        if spec is None:
+            return None
+        dest, kind, _ = spec
+        i += 1
+        if kind is bool:
+            if sep:
+                return None
+            values[dest] = True
+            continue
+        if not sep:
+            if i == len(argv) or argv[i].startswith("-"):
+                return None
+            value = argv[i]
+            i += 1
+        if kind is list:
+            values[dest].append(value)
+        elif kind is int:
+            try:
+                values[dest] = int(value)
+            except ValueError:
+                return None
+        else:
+            values[dest] = value
+    
+    # Leave the required and mutually exclusive checks' errors to argparse
+    if values["adb_path"] is None or (values["goal"] is None) == (values["goals_file"] is None):
+        return None
+    return argparse.Namespace(**values)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    """Parse command line arguments.
+    
+    Well-formed command lines are parsed by a simple loop; argparse is only
+    set up for --help and for reporting errors.
+    
+    Args:
+        argv: Arguments to parse; sys.argv[1:] if None
+    """
+    args = _fast_parse_args(sys.argv[1:] if argv is None else argv)
+    if args is not None:
+        return args
+    
     parser = argparse.ArgumentParser(description="Android Agent - Automate Android devices")
     
     parser.add_argument("--adb_path", required=True, help="Path to ADB executable")
-    parser.add_argument("--goal", required=True, help="Goal to achieve on the device")
+    goal_group = parser.add_mutually_exclusive_group(required=True)
+    goal_group.add_argument("--goal", help="Goal to achieve on the device")
+    goal_group.add_argument("--goals_file",
+                          help="File with one goal per line, run in order by the same agent")
     parser.add_argument("--api_key", help="OpenAI API key (can also set OPENAI_API_KEY env var)")
     parser.add_argument("--model", default="gpt-4o", help="OpenAI model to use")
     parser.add_argument("--max_steps", type=int, default=50, help="Maximum number of steps")
     parser.add_argument("--pause", action="store_true", help="Pause after each action")
     parser.add_argument("--screenshots", default="screenshots", help="Screenshot directory")
+    parser.add_argument("--screenshot_max", type=int, default=768,
+                      help="Longest side of screenshots sent to the model in pixels (0 to keep full size)")
+    parser.add_argument("--screenshot_quality", type=int, default=80,
+                      help="JPEG quality of screenshots sent to the model")
     parser.add_argument("--context", help="Additional context")
     parser.add_argument("--instruction", action="append", dest="instructions", default=[],
                       help="Additional instructions (can be repeated)")
@@ -92,197 +276,507 @@ def parse_args():
     parser.add_argument("--example", help="Name of example task to run (e.g. 'search_google', 'test_input')")
     parser.add_argument("--skip_chrome_setup", action="store_true",
                       help="Skip Chrome first-run setup if possible")
+    parser.add_argument("--pipeline", action="store_true",
+                      help="Capture the next screen while the planner is still streaming its response")
+    parser.add_argument("--use_tools", action="store_true",
+                      help="Let the model return several actions per response as tool calls")
     
-    return parser.parse_args()
+    parser.add_argument("--daemon", action="store_true",
+                      help="Hand the run to a daemon started with --serve_daemon, if one is listening")
+    parser.add_argument("--serve_daemon", action="store_true",
+                      help="Serve --daemon runs from this long-lived process over a Unix socket")
+    
+    return parser.parse_args(argv)
+
+
+_DEFAULT_INSTRUCTIONS = (
+    "Be precise with tap coordinates, ensuring they are within visible UI elements",
+    "Wait for the keyboard to appear before attempting to type text",
+    "If keyboard doesn't appear after tapping an input field, try tapping again",
+    "If a tap doesn't produce the expected result, try a slightly different location",
+    "When typing, make sure to press enter/search after completing input",
+    "If stuck in a loop, try using the back button or going to home screen",
+    "Be patient when waiting for apps to load or respond to actions",
+    "Verify that actions produce visible changes before proceeding",
+    "If Chrome shows first-run screen, look for and tap 'Use without an account'",
+    "If first-run screen persists, try tapping different parts of the screen",
+    "After bypassing first-run, wait for Chrome to fully load before proceeding"
+)
+_DEFAULT_INSTRUCTIONS_LOWER = tuple(instr.lower() for instr in _DEFAULT_INSTRUCTIONS)
 
 
 def add_default_instructions(instructions: list) -> list:
-    """Add default instructions if not already provided.
+    """Add default instructions, dropping user instructions that repeat one.
     
     Args:
         instructions: List of user-provided instructions
         
     Returns:
-        List with default instructions added
+        Default instructions followed by the user-provided ones
     """
-    default_instructions = [
-        "Be precise with tap coordinates, ensuring they are within visible UI elements",
-        "Wait for the keyboard to appear before attempting to type text",
-        "If keyboard doesn't appear after tapping an input field, try tapping again",
-        "If a tap doesn't produce the expected result, try a slightly different location",
-        "When typing, make sure to press enter/search after completing input",
-        "If stuck in a loop, try using the back button or going to home screen",
-        "Be patient when waiting for apps to load or respond to actions",
-        "Verify that actions produce visible changes before proceeding",
-        "If Chrome shows first-run screen, look for and tap 'Use without an account'",
-        "If first-run screen persists, try tapping different parts of the screen",
-        "After bypassing first-run, wait for Chrome to fully load before proceeding"
-    ]
-    
-    # Add defaults that don't already exist
-    result = list(instructions)
-    for default in default_instructions:
-        # Check if any instruction contains this default as a substring
-        if not any(default.lower() in instr.lower() for instr in result):
-            result.append(default)
+    # All defaults always go first, in a fixed order, so the start of the
+    # instruction block is the same in every run and stays inside the
+    # planner's prompt-cache prefix
+    result = list(_DEFAULT_INSTRUCTIONS)
+    result.extend(
+        instr for instr in instructions
+        if instr.strip().lower() not in _DEFAULT_INSTRUCTIONS_LOWER
+    )
             
     return result
 
 
-def check_keyboard_state(adb_path: str) -> None:
+def read_goals_file(path: str) -> List[str]:
+    """Read goals from a file, one per line.
+    
+    Blank lines and lines starting with '#' are skipped.
+    
+    Args:
+        path: Path to the goals file
+        
+    Returns:
+        The goals in file order
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def report_status(agent: "AndroidAgent") -> int:
+    """Print the outcome of the agent's run.
+    
+    Args:
+        agent: Agent that finished running
+        
+    Returns:
+        Process exit code for the outcome
+    """
+    from android_agent.android_agent import AndroidGoalState
+    
+    if agent.status == AndroidGoalState.SUCCESS:
+        print("\n✅ Goal achieved successfully!")
+        return 0
+    elif agent.status == AndroidGoalState.FAILED:
+        print("\n❌ Failed to achieve goal.")
+        return 1
+    else:
+        print("\n⚠️ Goal not completed (reached maximum steps)")
+        return 1
+
+
+def check_keyboard_state(adb_path: str, session=None) -> None:
     """Check and report keyboard state.
     
     Args:
         adb_path: Path to ADB executable
+        session: Optional persistent shell session (AdbSession or AdbClient)
     """
+    from android_agent.android_controller import check_and_dismiss_keyboard
+    
     try:
-        keyboard_visible = is_keyboard_visible(adb_path)
-        print(f"Keyboard visible: {keyboard_visible}")
-        
-        if keyboard_visible:
-            print("Dismissing keyboard before starting...")
-            dismiss_keyboard(adb_path)
+        if check_and_dismiss_keyboard(adb_path, session=session):
+            print("Keyboard was visible - dismissed it before starting")
+        else:
+            print("Keyboard visible: False")
     except Exception as e:
         print(f"Error checking keyboard state: {e}")
 
 
-def launch_chrome(adb_path: str, skip_setup: bool = False) -> bool:
-    """Launch Chrome with first-run handling.
+# Goals mentioning either word get Chrome launched before the agent starts
+_CHROME_RE = re.compile(r"chrome|browser", re.IGNORECASE)
+
+
+# Planners kept alive between runs served by the same process
+_PLANNERS: Dict[Tuple[str, str, bool, bool], "OpenAIPlanner"] = {}
+
+
+def get_planner(api_key: str, model: str, debug: bool = False, use_tools: bool = False) -> "OpenAIPlanner":
+    """Return a planner for these settings, reusing one created by an earlier run.
     
     Args:
-        adb_path: Path to ADB executable
-        skip_setup: Whether to try skipping first-run setup
+        api_key: OpenAI API key
+        model: OpenAI model to use
+        debug: Whether to log full model responses
+        use_tools: Whether the model returns actions as tool calls
         
     Returns:
-        bool: True if Chrome launched successfully
+        The planner
     """
-    print("\n🌐 Launching Chrome with first-run handling...")
+    from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
     
-    # First try direct launch with flags to skip first-run
-    if skip_setup:
-        try:
-            cmd = f"{adb_path} shell am start -a android.intent.action.VIEW -d \"about:blank\" -n com.android.chrome/com.google.android.apps.chrome.Main --es \"com.android.chrome.firstrun.skip\" \"true\""
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            
-            if result.returncode == 0 and "Error" not in result.stdout:
-                print("✅ Chrome launched with skip-first-run flag")
-                time.sleep(2)  # Wait for Chrome to load
-                return True
-        except Exception as e:
-            print(f"⚠️ Direct launch failed: {e}")
+    key = (api_key, model, debug, use_tools)
+    planner = _PLANNERS.get(key)
+    if planner is None:
+        options = OpenAIPlannerOptions(api_key=api_key, model=model, debug=debug, use_tools=use_tools)
+        planner = _PLANNERS[key] = OpenAIPlanner(options=options)
+    return planner
+
+
+_EXIT_MARKER = "\0android_agent_exit:"
+
+# Environment variables forwarded from the client to the daemon for each run.
+# The API key is deliberately not among them: the daemon uses its own.
+_FORWARDED_ENV = ("ANDROID_SERIAL",)
+
+# Seconds the daemon waits on a silent or stalled client before giving up on it
+_CLIENT_TIMEOUT = 10.0
+
+
+def _owned_private(st: os.stat_result) -> bool:
+    """Whether a file belongs to this user and is inaccessible to anyone else."""
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _daemon_socket_path(create: bool = False) -> Optional[str]:
+    """Locate the daemon socket inside a directory only this user can access.
+    
+    Uses $XDG_RUNTIME_DIR when set, otherwise a 0700 android_agent-<uid>
+    directory in the temp directory.
     
-    # If direct launch fails, try standard launch
+    Args:
+        create: Create the temp directory if it doesn't exist
+        
+    Returns:
+        Path of the socket, or None if the directory is missing or could be
+        reached by other users
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"android_agent-{os.getuid()}")
+        if create:
+            with contextlib.suppress(FileExistsError):
+                os.mkdir(runtime_dir, 0o700)
+    try:
+        st = os.lstat(runtime_dir)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode) or not _owned_private(st):
+        return None
+    return os.path.join(runtime_dir, "android_agent.sock")
+
+
+class _ClientDisconnected(KeyboardInterrupt):
+    """The daemon client went away mid-run; stops the run like Ctrl+C would."""
+
+
+class _ClientWriter(io.TextIOBase):
+    """Text stream that forwards a daemon run's output to its client.
+    
+    Once the client has gone away, the next write on the main thread raises
+    _ClientDisconnected so the run stops instead of carrying on unwatched.
+    Further output is dropped so the run can still finish its cleanup.
+    """
+    
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self.gone = False
+        self.at_line_start = True
+        self._stopped = False
+    
+    def write(self, text: str) -> int:
+        if not self.gone:
+            try:
+                self._stream.write(text)
+                self._stream.flush()
+                if text:
+                    self.at_line_start = text.endswith("\n")
+            except OSError:
+                self.gone = True
+        # Only the main thread runs the agent loop; workers just mark the client gone
+        if self.gone and not self._stopped and threading.current_thread() is threading.main_thread():
+            self._stopped = True
+            raise _ClientDisconnected()
+        return len(text)
+
+
+def _serve_request(conn: socket.socket) -> None:
+    """Run one client's request, streaming its output back over the connection."""
+    conn.settimeout(_CLIENT_TIMEOUT)
+    stream = conn.makefile("rw", encoding="utf-8", newline="\n")
+    try:
+        request = json.loads(stream.readline())
+        argv, env, cwd = request["argv"], request.get("env", {}), request.get("cwd")
+    except (OSError, ValueError, KeyError, TypeError):
+        return
+    
+    saved_env = {name: os.environ.get(name) for name in _FORWARDED_ENV}
+    saved_cwd = os.getcwd()
+    writer = _ClientWriter(stream)
     try:
-        cmd = f"{adb_path} shell am start -a android.intent.action.VIEW -d \"about:blank\" -n com.android.chrome/com.google.android.apps.chrome.Main"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        os.environ.update({name: env[name] for name in _FORWARDED_ENV if name in env})
+        if cwd:
+            os.chdir(cwd)
+        with contextlib.redirect_stdout(writer), contextlib.redirect_stderr(writer):
+            try:
+                code = run_goal(parse_args(argv))
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except _ClientDisconnected:
+                # Raised outside run_goal's own handling; nobody is left to report to
+                return
+        if writer.gone:
+            return
+        if not writer.at_line_start:
+            # The marker must start its own line for the client to find it
+            writer.write("\n")
+        writer.write(f"{_EXIT_MARKER}{code}\n")
+    except OSError:
+        pass
+    finally:
+        os.chdir(saved_cwd)
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def serve_daemon() -> int:
+    """Serve runs from this process until interrupted.
+    
+    Keeps planners (and their HTTP connections), the adb server client and
+    the imported modules warm between runs. Runs are served one at a time
+    and use this process's OPENAI_API_KEY.
+    
+    Returns:
+        Process exit code
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: --serve_daemon needs Unix domain sockets")
+        return 1
+    path = _daemon_socket_path(create=True)
+    if path is None:
+        print("Error: No private directory for the daemon socket (check $XDG_RUNTIME_DIR or the temp directory)")
+        return 1
+    
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Create the socket 0600 from the start rather than chmod-ing it afterwards
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(1)
+    print(f"🛰️ Android Agent daemon listening on {path}")
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                _serve_request(conn)
+    except KeyboardInterrupt:
+        print("\nDaemon stopped")
+        return 0
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+def run_via_daemon(argv: List[str]) -> Optional[int]:
+    """Hand a run to a listening daemon and stream its output.
+    
+    The socket is only used if it and its directory belong to this user and
+    are closed to everyone else.
+    
+    Args:
+        argv: Command line arguments for the run
         
-        if result.returncode == 0 and "Error" not in result.stdout:
-            print("✅ Chrome launched with standard command")
-            time.sleep(2)
-            
-            # Check if we're in first-run screen
-            current_app = get_current_app(adb_path)
-            if "firstrun" in current_app.lower():
-                print("⚠️ First-run screen detected - attempting to bypass")
-                # Try tapping "Use without an account" at different positions
-                for y in [0.75, 0.8, 0.85]:
-                    tap_cmd = f"{adb_path} shell input tap 540 {int(2400 * y)}"
-                    subprocess.run(tap_cmd, shell=True)
-                    time.sleep(1)
-                    
-                    # Check if we're out of first-run
-                    current_app = get_current_app(adb_path)
-                    if "firstrun" not in current_app.lower():
-                        print("✅ Successfully bypassed first-run screen")
-                        return True
-                
-                print("⚠️ Could not bypass first-run screen")
-                return False
-            
-            return True
-    except Exception as e:
-        print(f"⚠️ Standard launch failed: {e}")
+    Returns:
+        The run's exit code, or None if no usable daemon is listening
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = _daemon_socket_path()
+    try:
+        st = os.lstat(path) if path else None
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISSOCK(st.st_mode) or not _owned_private(st):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
     
-    return False
+    request = {
+        "argv": argv,
+        "env": {name: os.environ[name] for name in _FORWARDED_ENV if name in os.environ},
+        "cwd": os.getcwd()
+    }
+    with sock, sock.makefile("rw", encoding="utf-8", newline="\n") as stream:
+        try:
+            stream.write(json.dumps(request) + "\n")
+            stream.flush()
+            for line in stream:
+                if line.startswith(_EXIT_MARKER):
+                    return int(line[len(_EXIT_MARKER):])
+                sys.stdout.write(line)
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            # Closing the connection makes the daemon stop the run
+            print("\nOperation aborted by user")
+            return 130
+    print("\n⚠️ Daemon closed the connection before the run finished")
+    return 1
 
 
 def main():
     """Main entry point."""
-    args = parse_args()
+    argv = sys.argv[1:]
+    if "--serve_daemon" in argv:
+        return serve_daemon()
     
-    # Validate environment
-    if not validate_environment(args.adb_path):
-        return 1
+    args = parse_args(argv)
+    if args.daemon:
+        if args.api_key:
+            # Never send the key over the socket; the daemon uses its own
+            print("Error: --api_key can't be used with --daemon; start the daemon with OPENAI_API_KEY set")
+            return 1
+        code = run_via_daemon(argv)
+        if code is not None:
+            return code
+        print("⚠️ No daemon listening - running in this process")
+    return run_goal(args)
+
+
+def run_goal(args: argparse.Namespace) -> int:
+    """Run the agent towards the goal(s) given on the command line.
+    
+    Args:
+        args: Parsed command line arguments
         
-    # Get API key
-    api_key = get_api_key(args.api_key)
-    if not api_key:
-        print("Error: OpenAI API key required (via --api_key or OPENAI_API_KEY)")
-        return 1
+    Returns:
+        Process exit code
+    """
+    # Planner and state tracker details are logged at DEBUG; show them only with --debug.
+    # force=True rebinds the handler to the current stderr for each daemon run.
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="%(message)s",
+        force=True
+    )
     
-    # Create screenshots directory
-    os.makedirs(args.screenshots, exist_ok=True)
+    if args.goals_file:
+        try:
+            goals = read_goals_file(args.goals_file)
+        except OSError as e:
+            print(f"Error: Could not read goals file: {e}")
+            return 1
+        if not goals:
+            print(f"Error: No goals found in {args.goals_file}")
+            return 1
+    else:
+        goals = [args.goal]
+    
+    # Validate environment, create the screenshots directory and build the
+    # planner concurrently - none of them depends on the others
+    with ThreadPoolExecutor(3) as pool:
+        env_future = pool.submit(validate_environment, args.adb_path)
+        dir_future = pool.submit(os.makedirs, args.screenshots, exist_ok=True)
+        
+        # Get API key; the planner (and the agent package) is only loaded with one
+        api_key = get_api_key(args.api_key)
+        planner_future = (
+            pool.submit(get_planner, api_key, args.model, args.debug, args.use_tools) if api_key else None
+        )
+        
+        if not env_future.result():
+            return 1
+        if not api_key:
+            print("Error: OpenAI API key required (via --api_key or OPENAI_API_KEY)")
+            return 1
+        try:
+            dir_future.result()
+        except OSError as e:
+            print(f"Error: Could not create screenshots directory: {e}")
+            return 1
+        try:
+            planner = planner_future.result()
+        except Exception as e:
+            print(f"Error: Could not initialize planner: {e}")
+            if args.debug:
+                import traceback
+                traceback.print_exc()
+            return 1
+    
+    from android_agent.adb_session import AdbClient, AdbSession
+    from android_agent.android_agent import AndroidAgent, AndroidAgentOptions
+    from android_agent.android_controller import check_and_dismiss_keyboard, launch_chrome, press_home
     
     # Add default instructions
     instructions = add_default_instructions(args.instructions)
     
-    # Initialize planner
-    planner_options = OpenAIPlannerOptions(
-        api_key=api_key,
-        model=args.model,
-        debug=args.debug
-    )
-    planner = OpenAIPlanner(options=planner_options)
-    
     # Initialize agent options
     agent_options = AndroidAgentOptions(
         additional_context=args.context,
         additional_instructions=instructions,
         pause_after_each_action=args.pause,
         max_steps=args.max_steps,
-        screenshot_dir=args.screenshots
+        screenshot_dir=args.screenshots,
+        screenshot_max_dim=args.screenshot_max or None,
+        screenshot_format="jpeg",
+        screenshot_quality=args.screenshot_quality
     )
     
     # Initialize agent
     agent = AndroidAgent(
         adb_path=args.adb_path,
         action_planner=planner,
-        goal=args.goal,
+        goal=goals[0],
         options=agent_options
     )
     
+    # Setup and cleanup commands share one shell: the adb server client when
+    # it is reachable, otherwise a persistent adb shell process
+    session = _ADB_CLIENT or AdbSession(args.adb_path)
+    
     try:
         # Check for keyboard to avoid starting with keyboard visible
         if args.keyboard_check:
-            check_keyboard_state(args.adb_path)
-        
-        # If goal involves Chrome, try to launch it first
-        if "chrome" in args.goal.lower() or "browser" in args.goal.lower():
-            if not launch_chrome(args.adb_path, args.skip_chrome_setup):
-                print("⚠️ Could not launch Chrome - proceeding with agent anyway")
+            check_keyboard_state(args.adb_path, session=session)
         
-        # Start agent
-        print(f"\n========== Starting Android Agent ==========")
-        print(f"Goal: {args.goal}")
-        print(f"Model: {args.model}")
-        print(f"Max steps: {args.max_steps}")
-        print(f"Screenshots: {args.screenshots}")
-        if args.debug:
-            print("Debug mode enabled")
-        print("\nPress Ctrl+C to abort\n")
-        
-        agent.start()
+        # One agent and planner serve every goal; only per-goal state is reset
+        codes = []
+        for index, goal in enumerate(goals, 1):
+            if index > 1:
+                agent.reset(goal)
+            if len(goals) > 1:
+                # Keep each goal's screenshots apart
+                agent.options.screenshot_dir = os.path.join(args.screenshots, f"goal_{index:02d}")
+                os.makedirs(agent.options.screenshot_dir, exist_ok=True)
+            
+            # If goal involves Chrome, try to launch it first
+            if _CHROME_RE.search(goal):
+                if not launch_chrome(args.adb_path, args.skip_chrome_setup, session=session):
+                    print("⚠️ Could not launch Chrome - proceeding with agent anyway")
+            
+            # Start agent; the banner is collected and written in one go
+            if len(goals) > 1:
+                banner = [f"\n========== Starting Android Agent (goal {index}/{len(goals)}) =========="]
+            else:
+                banner = ["\n========== Starting Android Agent =========="]
+            banner += [
+                f"Goal: {goal}",
+                f"Model: {args.model}",
+                f"Max steps: {args.max_steps}",
+                f"Screenshots: {agent.options.screenshot_dir}"
+            ]
+            if args.debug:
+                banner.append("Debug mode enabled")
+            banner.append("\nPress Ctrl+C to abort\n")
+            print("\n".join(banner), flush=True)
+            
+            agent.start(prefetch=args.pipeline)
+            
+            # Report final status
+            codes.append(report_status(agent))
         
-        # Report final status
-        if agent.status == AndroidGoalState.SUCCESS:
-            print("\n✅ Goal achieved successfully!")
-            return 0
-        elif agent.status == AndroidGoalState.FAILED:
-            print("\n❌ Failed to achieve goal.")
-            return 1
-        else:
-            print("\n⚠️ Goal not completed (reached maximum steps)")
-            return 1
+        if len(goals) > 1:
+            print(f"\n{codes.count(0)}/{len(goals)} goals achieved")
+        return max(codes)
         
     except KeyboardInterrupt:
         print("\nOperation aborted by user")
@@ -299,15 +793,27 @@ def main():
         # Cleanup
         try:
             print("\nPerforming cleanup...")
-            # Try to go back to home screen
-            press_home(args.adb_path)
-            # Check if keyboard is visible and dismiss it
-            if is_keyboard_visible(args.adb_path):
-                print("Dismissing keyboard...")
-                dismiss_keyboard(args.adb_path)
+            # Go back to home screen while checking for (and dismissing) the
+            # keyboard. The adb server client opens a connection per request,
+            # so the keyboard probe gets its own client (and last_returncode)
+            # and runs alongside the home press; a persistent AdbSession runs
+            # them back to back
+            if isinstance(session, AdbClient):
+                probe = AdbClient(session.host, session.port, session.serial, session.timeout)
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    keyboard_future = pool.submit(check_and_dismiss_keyboard, args.adb_path, session=probe)
+                    press_home(args.adb_path, session=session)
+                    dismissed = keyboard_future.result()
+            else:
+                press_home(args.adb_path, session=session)
+                dismissed = check_and_dismiss_keyboard(args.adb_path, session=session)
+            if dismissed:
+                print("Dismissed keyboard")
         except Exception as e:
             if args.debug:
                 print(f"Cleanup error: {e}")
+        if isinstance(session, AdbSession):
+            session.close()
 
 
 if __name__ == "__main__":
@@ -6,8 +6,10 @@ to verify that the function name issue is fixed.
 """
 
 import argparse
+import logging
 import os
 import sys
+from functools import lru_cache
 
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -25,6 +27,21 @@ def get_api_key():
     return api_key
 
 
+@lru_cache(maxsize=4)
+def _get_planner(api_key: str, model: str, debug: bool) -> OpenAIPlanner:
+    """Create a planner, reusing it when main() runs again in the same process.
+    
+    Args:
+        api_key: OpenAI API key
+        model: OpenAI model to use
+        debug: Whether to enable planner debug output
+        
+    Returns:
+        The planner
+    """
+    return OpenAIPlanner(options=OpenAIPlannerOptions(api_key=api_key, model=model, debug=debug))
+
+
 def main():
     """Run a simple test to verify the function name fix."""
     # Parse command line arguments
@@ -32,16 +49,14 @@ def main():
     parser.add_argument("--adb_path", required=True, help="Path to ADB executable")
     args = parser.parse_args()
     
+    # The planner runs with debug=True, so show its DEBUG detail too
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     # Get API key
     api_key = get_api_key()
     
     # Initialize planner
-    planner_options = OpenAIPlannerOptions(
-        api_key=api_key,
-        model="gpt-4o",
-        debug=True
-    )
-    planner = OpenAIPlanner(options=planner_options)
+    planner = _get_planner(api_key, "gpt-4o", True)
     
     # Initialize agent
     agent_options = AndroidAgentOptions(
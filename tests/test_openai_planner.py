@@ -0,0 +1,60 @@
+"""Tests for OpenAIPlanner's tool-call planning."""
+
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from android_agent.android_action import AndroidActionType
+from android_agent.android_state import AndroidState
+from android_agent.openai_planner import OpenAIPlanner, OpenAIPlannerOptions
+
+
+class _FakeCompletions:
+    """Returns one canned tool-call response and records the request arguments."""
+
+    def __init__(self, tool_args):
+        self.tool_args = tool_args
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        calls = [
+            SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(args)))
+            for args in self.tool_args
+        ]
+        # Without parallel calls the model returns a single tool call
+        if not kwargs.get("parallel_tool_calls"):
+            calls = calls[:1]
+        message = SimpleNamespace(content="```observation\nHome screen\n```", tool_calls=calls)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _planner(tool_args):
+    planner = OpenAIPlanner(OpenAIPlannerOptions(api_key="test", use_tools=True, prompt_cache=False))
+    completions = _FakeCompletions(tool_args)
+    planner.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return planner, completions
+
+
+def _state():
+    return AndroidState(screenshot="", width=1080, height=2400, current_app="com.android.launcher3")
+
+
+TWO_TAPS = [{"action": "TAP", "x": 0.5, "y": 0.1}, {"action": "TAP", "x": 0.5, "y": 0.9}]
+
+
+def test_plan_stream_yields_every_tool_call():
+    planner, completions = _planner(TWO_TAPS)
+    actions = list(planner.plan_stream("Open Chrome", current_state=_state()))
+    assert [a.action for a in actions] == [AndroidActionType.TAP, AndroidActionType.TAP]
+    assert completions.requests[0]["parallel_tool_calls"] is True
+
+
+def test_plan_action_requests_a_single_tool_call():
+    planner, completions = _planner(TWO_TAPS)
+    action = planner.plan_action("Open Chrome", current_state=_state())
+    assert action.action == AndroidActionType.TAP
+    assert completions.requests[0]["parallel_tool_calls"] is False
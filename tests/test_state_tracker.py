@@ -0,0 +1,24 @@
+"""Tests for AndroidStateTracker's input-box detection."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from android_agent.state_tracker import AndroidStateTracker
+
+
+def test_input_bands_include_950_edges():
+    tracker = AndroidStateTracker()
+    # Right edge of the URL-bar band on the 0-1000 grid
+    assert tracker._is_input_box((950, 100))
+    # Right edge of the form-field band
+    assert tracker._is_input_box((950, 500))
+    # Normalized coordinates on the same edges
+    assert tracker._is_input_box((0.95, 0.1))
+    assert tracker._is_input_box((0.95, 0.5))
+
+
+def test_outside_input_bands():
+    tracker = AndroidStateTracker()
+    assert not tracker._is_input_box((960, 500))